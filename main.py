@@ -2,46 +2,85 @@
 """Single entrypoint for running the project:
 
 Subcommands:
-  gui       Launch the pygame GUI
-  tourney   Run AI-vs-AI tournaments and save CSV
+  gui       Launch the pygame GUI (--game ultimate for the 9x9 variant)
+  tourney   Run AI-vs-AI tournaments and save CSV (--game ultimate for the 9x9 variant)
   plot      Produce plots from a CSV
+  traj      Summarize a trajectory sidecar written by tourney --trajectories
+  bench     Time serial vs parallel Level 3 search on a larger board
+  bench-engine  Time the scalar engine functions against the numpy batch versions
+  bench-search  Compare the Level 3 search algorithms on a fixed position suite
+  export-positions  Solve every reachable position and write .npy arrays
+  solve     Prove the game value of an m,n,k board with proof-number search
+  verify    Cross-check optimized engines and players against their references
 
 Examples:
   python main.py tourney --games 300 --out results.csv
   python main.py plot results.csv --out plots.png
+  python main.py traj results.csv.traj --top 10
+  python main.py bench --size 4 --fill 6 --workers 4
+  python main.py bench-engine --boards 100000
+  python main.py bench-search --sizes 3,4,5 --depth 4
+  python main.py export-positions positions/ --dedupe
+  python main.py solve --rows 4 --cols 4 --k 3 --dump solved/
+  python main.py verify --checks engine,level2
   python main.py gui
+  python main.py tourney --game ultimate --games 20
+  python main.py tourney --search-cache search.db
 """
 import argparse
 import csv
+import os
 import subprocess
 import sys
 import time
 from collections import defaultdict
-import math
-
-import matplotlib.pyplot as plt
-
-from src.tictactoe_engine import new_board, make_move_in_place, check_winner, is_tie, get_next_player, X, O
-from src.Level1.ai_player import get_move as ai1_get_move
-from src.Level2.start import get_move as ai2_get_move
-from src.Level3.ai_level3 import get_move as ai3_get_move
-
-AI_MODULES = {
-    1: type('AI1', (), {'get_move': staticmethod(ai1_get_move)})(),
-    2: type('AI2', (), {'get_move': staticmethod(ai2_get_move)})(),
-    3: type('AI3', (), {'get_move': staticmethod(ai3_get_move)})(),
-}
-
-
-def play_game(ai_X_module, ai_O_module, starting_player=X):
+import random
+
+from src.tictactoe_engine import (
+    new_board, make_move_in_place, apply_move, available_moves, check_winner, is_tie, is_terminal,
+    get_next_player, X, O, to_array, batch_winners, batch_terminal, batch_legal,
+)
+from src.Level3.ai_level3 import bench_parallel
+from src.Level3.search import Searcher, ALGORITHMS
+from src.players import make_player, levels
+from src.ultimate.engine import new_state as new_ultimate_state, legal_moves as ultimate_moves, \
+    play_in_place as ultimate_play
+from src.trajectories import encode, decode, write_codes, trajectory_counts
+from src.time_control import MoveTimeout, MoveWorker, parse_time_controls
+from src.metrics import TournamentMetrics
+from src.positions import export_positions
+from src.scheduler import Scheduler, static_makespan
+from src.search_cache import ENV_VAR as SEARCH_CACHE_ENV
+from src.plot_pipeline import load_results, aggregate, render_figures
+from src.equivalence import CHECKS, run_checks, report
+from src.pn_search import DFPNSolver
+
+# Shared default players (unseeded); tournaments build their own per pairing
+AI_MODULES = {level: make_player(level) for level in levels()}
+
+# Games advanced together per batched get_moves call
+BATCH_SIZE = 512
+
+
+def play_game(ai_X_module, ai_O_module, starting_player=X, record=None, times=None):
+    # `record`, if given, is a list that receives every move placed on the board;
+    # `times`, if given, is a dict accumulating seconds spent by X and O.
+    # Players get new_game() first and observe() each move of their opponent.
+    _new_game(ai_X_module, ai_O_module)
     board = new_board()
     current = starting_player
     moves = 0
     while True:
-        if current == X:
-            move = ai_X_module.get_move(board, X) if ai_X_module else None
-        else:
-            move = ai_O_module.get_move(board, O) if ai_O_module else None
+        ai = ai_X_module if current == X else ai_O_module
+        t0 = time.perf_counter()
+        try:
+            move = ai.get_move(board, current) if ai else None
+        except MoveTimeout:
+            # Out of time: forfeit, just like an illegal move
+            return get_next_player(current), moves + 1
+        finally:
+            if times is not None:
+                times[current] = times.get(current, 0.0) + time.perf_counter() - t0
 
         if move is None:
             break
@@ -51,6 +90,11 @@ def play_game(ai_X_module, ai_O_module, starting_player=X):
         if not made:
             winner = get_next_player(current)
             return winner, moves
+        if record is not None:
+            record.append(move)
+        other = ai_O_module if current == X else ai_X_module
+        if other:
+            other.observe(move)
 
         w = check_winner(board)
         if w is not None:
@@ -61,117 +105,330 @@ def play_game(ai_X_module, ai_O_module, starting_player=X):
         current = get_next_player(current)
 
 
-def run_tournament(pairs, games, out_path, start_mode='alternate'):
-    with open(out_path, 'w', newline='') as f:
-        fieldnames = ['ai_X_level', 'ai_O_level', 'starting_player', 'winner', 'moves', 'duration_s']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for (a, b) in pairs:
-            if start_mode == 'alternate':
-                half = games // 2
-                _run_pair(a, b, half, writer, start_player=X)
-                _run_pair(a, b, games - half, writer, start_player=O)
+def play_ultimate_game(ai_X_module, ai_O_module, starting_player=X, record=None, times=None):
+    # Same contract as play_game, on an ultimate tic-tac-toe state
+    _new_game(ai_X_module, ai_O_module)
+    state = new_ultimate_state(starting_player)
+    moves = 0
+    while state.winner is None:
+        current = state.player
+        ai = ai_X_module if current == X else ai_O_module
+        t0 = time.perf_counter()
+        try:
+            move = ai.get_move(state.copy(), current)
+        except MoveTimeout:
+            return get_next_player(current), moves + 1
+        finally:
+            if times is not None:
+                times[current] = times.get(current, 0.0) + time.perf_counter() - t0
+        moves += 1
+        if move not in ultimate_moves(state):
+            return get_next_player(current), moves
+        ultimate_play(state, move)
+        if record is not None:
+            record.append(move)
+        (ai_O_module if current == X else ai_X_module).observe(move)
+    return state.winner, moves
+
+
+def _new_game(ai_X_module, ai_O_module):
+    for side, ai in ((X, ai_X_module), (O, ai_O_module)):
+        if ai:
+            ai.new_game(side)
+
+
+def play_games(ai_X_module, ai_O_module, games, starting_player=X, record=None, times=None):
+    """Play `games` games in lockstep, one batched get_moves call per ply.
+
+    Returns a list of (winner, moves, duration_s). Every game starts with the
+    same player, so each ply only ever asks one side for moves; players are
+    shared across the games, so they must keep no per-game state. A game's
+    duration is its share of the wall time of the plies it took part in.
+    If `record` is a list, each game's placed moves are appended to it as
+    one list per game, in game order; `times` likewise receives one
+    {X: seconds, O: seconds} dict per game.
+    """
+    boards = [new_board() for _ in range(games)]
+    played = [[] for _ in range(games)]
+    side_times = [{X: 0.0, O: 0.0} for _ in range(games)]
+    results = [None] * games
+    durations = [0.0] * games
+    active = list(range(games))
+    current = starting_player
+    moves = 0
+    while active:
+        ai = ai_X_module if current == X else ai_O_module
+        t0 = time.perf_counter()
+        picks = ai.get_moves([boards[i] for i in active], [current] * len(active))
+        moves += 1
+        still_active = []
+        for i, move in zip(active, picks):
+            board = boards[i]
+            if move is None:
+                results[i] = ('Tie', moves - 1)
+            elif not make_move_in_place(board, move, current):
+                results[i] = (get_next_player(current), moves)
             else:
-                sp = X if start_mode == 'X' else O
-                _run_pair(a, b, games, writer, start_player=sp)
-
-
-def _run_pair(ai_level_X, ai_level_O, games, writer, start_player=X):
-    mod_X = AI_MODULES[ai_level_X]
-    mod_O = AI_MODULES[ai_level_O]
-    for i in range(games):
-        t0 = time.time()
-        winner, moves = play_game(mod_X, mod_O, starting_player=start_player)
-        duration = time.time() - t0
+                played[i].append(move)
+                w = check_winner(board)
+                if w is not None:
+                    results[i] = (w, moves)
+                elif is_tie(board):
+                    results[i] = ('Tie', moves)
+                else:
+                    still_active.append(i)
+        share = (time.perf_counter() - t0) / len(active)
+        for i in active:
+            durations[i] += share
+            side_times[i][current] += share
+        active = still_active
+        current = get_next_player(current)
+    if record is not None:
+        record.extend(played)
+    if times is not None:
+        times.extend(side_times)
+    return [(w, m, d) for (w, m), d in zip(results, durations)]
+
+
+FIELDNAMES = ['ai_X_level', 'ai_O_level', 'starting_player', 'winner', 'moves', 'duration_s',
+              'timeout', 'time_X_s', 'time_O_s']
+
+
+def run_tournament(pairs, games, out_path, start_mode='alternate', batch_size=BATCH_SIZE,
+                   traj_path=None, time_controls=None, status_path=None, status_interval=5.0,
+                   game='classic', workers=1, schedule='adaptive', seed=None):
+    # traj_path: optional sidecar receiving one encoded trajectory per CSV row
+    # time_controls: optional {level: TimeControl}; those levels are timed
+    # status_path: optional live metrics file (.prom or JSON), refreshed every status_interval s
+    # game: 'classic' or 'ultimate' (levels are those of players.PLAYERS[game])
+    # workers > 1 spreads games over processes; schedule is 'adaptive' (cost-aware
+    # work stealing) or 'static' (contiguous shards of the pairs list).
+    # seed: seeds every player's RNG; single-process runs are then reproducible
+    # Returns a dict with the wall time and, for multi-process runs, scheduler stats.
+    if traj_path and game != 'classic':
+        raise ValueError('trajectories are only recorded for the classic game')
+    traj_file = open(traj_path, 'wb') if traj_path else None
+    metrics = None
+    if status_path:
+        metrics = TournamentMetrics(status_path, len(pairs) * games, interval=status_interval,
+                                    workers=workers)
+    units = [((a, b), sp, n) for (a, b) in pairs for sp, n in _starts(games, start_mode) if n > 0]
+    chunk_kwargs = {'batch_size': batch_size, 'time_controls': time_controls, 'game': game,
+                    'seed': seed}
+    t0 = time.perf_counter()
+    stats = {}
+    try:
+        with open(out_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+
+            if workers > 1:
+                sched = Scheduler(units, play_chunk, workers, chunk_kwargs=chunk_kwargs,
+                                  steal=(schedule == 'adaptive'))
+                pair_seconds = defaultdict(float)
+                for pair, sp, batch in sched.run():
+                    pair_seconds[pair] += sum(g['duration'] for g in batch)
+                    _write_batch(writer, traj_file, metrics, pair, sp, batch)
+                stats = {
+                    'chunks': sched.chunks,
+                    'steals': sched.steals,
+                    'worker_busy_s': sched.busy,
+                    'static_estimate_s': static_makespan(list(pairs), pair_seconds, workers),
+                }
+            else:
+                for pair, sp, n in units:
+                    for batch in _pair_batches(pair, sp, n, **chunk_kwargs):
+                        _write_batch(writer, traj_file, metrics, pair, sp, batch)
+        if metrics:
+            metrics.close()
+            metrics = None
+    finally:
+        if metrics:
+            metrics.close(done=False)
+        if traj_file:
+            traj_file.close()
+    stats['wall_s'] = time.perf_counter() - t0
+    return stats
+
+
+def _starts(games, start_mode):
+    if start_mode == 'alternate':
+        half = games // 2
+        return [(X, half), (O, games - half)]
+    return [(X if start_mode == 'X' else O, games)]
+
+
+def _pair_batches(pair, start_player, games, batch_size=BATCH_SIZE, time_controls=None,
+                  game='classic', seed=None):
+    ai_level_X, ai_level_O = pair
+    time_controls = time_controls or {}
+    players, controls = {}, {}
+    for side, level in ((X, ai_level_X), (O, ai_level_O)):
+        player_seed = None if seed is None else f'{seed}/{ai_level_X}-{ai_level_O}/{start_player}/{side}'
+        players[side] = make_player(level, game, seed=player_seed)
+        if level in time_controls:
+            controls[side] = time_controls[level]
+    if game == 'ultimate':
+        return _play_timed(players, controls, games, start_player, play=play_ultimate_game)
+    if controls or any(p.stateful for p in players.values()):
+        return _play_timed(players, controls, games, start_player)
+    return _play_lockstep(players, games, start_player, batch_size)
+
+
+_chunks_played = 0
+
+
+def play_chunk(pair, start_player, games, seed=None, **kwargs):
+    # Entry point for scheduler worker processes: play and return all games.
+    # Chunks of one pairing must not replay the same seed, so each worker mixes
+    # in its pid and chunk count; seeded multi-process runs are not reproducible.
+    global _chunks_played
+    _chunks_played += 1
+    if seed is not None:
+        seed = f'{seed}/{os.getpid()}/{_chunks_played}'
+    return [g for batch in _pair_batches(pair, start_player, games, seed=seed, **kwargs)
+            for g in batch]
+
+
+def _write_batch(writer, traj_file, metrics, pair, start_player, batch):
+    ai_level_X, ai_level_O = pair
+    if traj_file:
+        write_codes(traj_file, [encode(g['played']) for g in batch])
+    if metrics:
+        metrics.add(pair, [g['duration'] for g in batch])
+    for g in batch:
         writer.writerow({
             'ai_X_level': ai_level_X,
             'ai_O_level': ai_level_O,
             'starting_player': start_player,
-            'winner': winner,
-            'moves': moves,
-            'duration_s': f"{duration:.6f}",
+            'winner': g['winner'],
+            'moves': g['moves'],
+            'duration_s': f"{g['duration']:.6f}",
+            'timeout': g['timeout'],
+            'time_X_s': f"{g['times'][X]:.6f}",
+            'time_O_s': f"{g['times'][O]:.6f}",
         })
 
 
-def load_results(path):
-    rows = []
-    with open(path, newline='') as f:
-        rdr = csv.DictReader(f)
-        for r in rdr:
-            rows.append(r)
-    return rows
-
-
-def improved_plots(csv_path, out_prefix='plots'):
-    rows = load_results(csv_path)
-
-    # Group by pairing
-    pair_stats = defaultdict(lambda: {'X': 0, 'O': 0, 'Tie': 0, 'moves': []})
-    for r in rows:
-        aX = int(r['ai_X_level'])
-        aO = int(r['ai_O_level'])
-        key = (aX, aO)
-        winner = r['winner']
-        moves = int(r.get('moves', 0))
-        pair_stats[key][winner] += 1
-        pair_stats[key]['moves'].append(moves)
-
-    # Build stacked bar chart per pairing (percentages)
-    labels = []
-    x_win = []
-    o_win = []
-    ties = []
-    for k in sorted(pair_stats.keys()):
-        stats = pair_stats[k]
-        total = stats['X'] + stats['O'] + stats['Tie']
-        if total == 0:
-            continue
-        labels.append(f"{k[0]}vs{k[1]}")
-        x_win.append(stats['X'] / total * 100)
-        o_win.append(stats['O'] / total * 100)
-        ties.append(stats['Tie'] / total * 100)
-
-    # Stacked bar
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ind = list(range(len(labels)))
-    p1 = ax.bar(ind, x_win, label='X wins', color='#4c72b0')
-    p2 = ax.bar(ind, o_win, bottom=x_win, label='O wins', color='#dd8452')
-    bottom_t = [x + y for x, y in zip(x_win, o_win)]
-    p3 = ax.bar(ind, ties, bottom=bottom_t, label='Ties', color='#55a868')
-    ax.set_ylabel('Percentage (%)')
-    ax.set_title('Results by Pairing (X-level vs O-level)')
-    ax.set_xticks(ind)
-    ax.set_xticklabels(labels, rotation=45)
-    ax.legend()
-    plt.tight_layout()
-    stacked_path = f"{out_prefix}_stacked.png"
-    fig.savefig(stacked_path)
-
-    # Boxplot of moves per pairing
-    groups = []
-    glabels = []
-    for k in sorted(pair_stats.keys()):
-        moves_list = pair_stats[k]['moves']
-        if moves_list:
-            groups.append(moves_list)
-            glabels.append(f"{k[0]}vs{k[1]}")
-
-    if groups:
-        fig2, ax2 = plt.subplots(figsize=(10, 5))
-        ax2.boxplot(groups, tick_labels=glabels, showmeans=True)
-        ax2.set_ylabel('Moves per game')
-        ax2.set_title('Distribution of Game Lengths by Pairing')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        box_path = f"{out_prefix}_moves_box.png"
-        fig2.savefig(box_path)
-    else:
-        box_path = None
-
-    print(f'Saved stacked bar to {stacked_path}')
-    if box_path:
-        print(f'Saved moves boxplot to {box_path}')
+def _play_lockstep(players, games, start_player, batch_size):
+    try:
+        for first in range(0, games, batch_size):
+            n = min(batch_size, games - first)
+            record, times = [], []
+            results = play_games(players[X], players[O], n, starting_player=start_player,
+                                 record=record, times=times)
+            yield [
+                {'winner': w, 'moves': m, 'duration': d, 'times': t, 'timeout': '', 'played': p}
+                for (w, m, d), t, p in zip(results, times, record)
+            ]
+    finally:
+        for p in players.values():
+            p.close()
+
+
+def _play_timed(players, controls, games, start_player, play=play_game):
+    # One game at a time; each side in `controls` plays from its own MoveWorker process
+    players = dict(players)
+    workers = {}
+    for side, control in controls.items():
+        players[side] = workers[side] = MoveWorker(players[side], control)
+    try:
+        for i in range(games):
+            played, times = [], {X: 0.0, O: 0.0}
+            t0 = time.perf_counter()
+            winner, moves = play(players[X], players[O], starting_player=start_player,
+                                 record=played, times=times)
+            duration = time.perf_counter() - t0
+            timeout = ''.join(side for side, w in workers.items() if w.clock.timed_out)
+            yield [{'winner': winner, 'moves': moves, 'duration': duration, 'times': times,
+                    'timeout': timeout, 'played': played}]
+    finally:
+        for p in players.values():
+            p.close()
+
+
+def improved_plots(csv_path, out_prefix='plots', workers=None):
+    agg = aggregate(load_results(csv_path))
+    status = render_figures(agg, [
+        ('stacked', f'{out_prefix}_stacked.png', {}),
+        ('moves_box', f'{out_prefix}_moves_box.png', {}),
+    ], workers=workers)
+    for path, state in status.items():
+        print(f'{"Saved" if state == "rendered" else "Unchanged"} {path}')
+
+
+def random_position(size, fill, seed=0):
+    # A reproducible, non-terminal position with `fill` stones already played
+    rng = random.Random(seed)
+    while True:
+        board = new_board(size)
+        player = X
+        for _ in range(fill):
+            if is_terminal(board):
+                break
+            board = apply_move(board, rng.choice(available_moves(board)), player)
+            player = get_next_player(player)
+        if not is_terminal(board):
+            return board, player
+
+
+def random_boards(count, size, seed=0):
+    # Boards after a random number of random moves, stopping at a win
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = new_board(size)
+        player = X
+        for _ in range(rng.randrange(size * size + 1)):
+            if check_winner(board) is not None:
+                break
+            make_move_in_place(board, rng.choice(available_moves(board)), player)
+            player = get_next_player(player)
+        boards.append(board)
+    return boards
+
+
+def bench_engine(boards):
+    """Time the scalar engine functions against their batch versions on
+    `boards`; returns {name: (scalar_s, batch_s)}, plus the array conversion."""
+    timings = {}
+    t0 = time.perf_counter()
+    arr = to_array(boards)
+    timings['to_array'] = (0.0, time.perf_counter() - t0)
+    for name, scalar, batch in (
+        ('winners', check_winner, batch_winners),
+        ('terminal', is_terminal, batch_terminal),
+        ('legal moves', available_moves, batch_legal),
+    ):
+        t0 = time.perf_counter()
+        for b in boards:
+            scalar(b)
+        scalar_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        batch(arr)
+        timings[name] = (scalar_s, time.perf_counter() - t0)
+    return timings
+
+
+def bench_search(size, positions, fill, depth=None, algos=ALGORITHMS, seed=0):
+    """Search the same `positions` random positions with each algorithm
+    (fresh transposition table per position); returns {algo: totals}."""
+    suite = [random_position(size, fill, seed=seed + i) for i in range(positions)]
+    totals = {}
+    for algo in algos:
+        t = totals[algo] = {'nodes': 0, 'cutoffs': 0, 'tt_hits': 0, 'ebf': 0.0,
+                            'seconds': 0.0, 'scores': []}
+        for board, player in suite:
+            r = Searcher(algo, depth).search(board, player)
+            for field in ('nodes', 'cutoffs', 'tt_hits', 'seconds'):
+                t[field] += r[field]
+            t['ebf'] += r['ebf'] / len(suite)
+            t['scores'].append(r['score'])
+    return totals
+
+
+SEARCH_CACHE_HELP = ('SQLite file of solved Level 3 positions, reused across runs '
+                     '(same as setting TTT_SEARCH_CACHE)')
 
 
 def cli():
@@ -179,24 +436,117 @@ def cli():
     sub = parser.add_subparsers(dest='cmd')
 
     sub_gui = sub.add_parser('gui')
+    sub_gui.add_argument('--game', choices=['classic', 'ultimate'], default='classic')
+    sub_gui.add_argument('--search-cache', default=None, help=SEARCH_CACHE_HELP)
     sub_tourney = sub.add_parser('tourney')
+    sub_tourney.add_argument('--game', choices=['classic', 'ultimate'], default='classic')
     sub_tourney.add_argument('--games', '-g', type=int, default=200)
     sub_tourney.add_argument('--pairs', '-p', default=None,
-                             help='Pairs like "1,2;1,3"; default all pairs among 1..3')
+                             help='Pairs like "1,2;1,3"; default all pairs among the AI levels')
     sub_tourney.add_argument('--out', '-o', default='tourney_results.csv')
     sub_tourney.add_argument('--start', choices=['X', 'O', 'alternate'], default='alternate')
+    sub_tourney.add_argument('--batch', type=int, default=BATCH_SIZE,
+                             help='Games played in lockstep per batched get_moves call')
+
+    sub_tourney.add_argument('--time-control', '-t', default=None,
+                             help='Per-level clocks like "3=0.05;2=5+0.1" (seconds per move, '
+                                  'or base+increment per game); running out of time loses')
+    sub_tourney.add_argument('--workers', '-w', type=int, default=1,
+                             help='Worker processes; >1 uses the cost-aware scheduler')
+    sub_tourney.add_argument('--schedule', choices=['adaptive', 'static'], default='adaptive',
+                             help='adaptive: work stealing with cost-sized chunks; static: equal shards of the pairs')
+    sub_tourney.add_argument('--status', default=None,
+                             help='Live metrics file, rewritten while running (.prom for Prometheus text, else JSON)')
+    sub_tourney.add_argument('--status-interval', type=float, default=5.0)
+    sub_tourney.add_argument('--seed', default=None,
+                             help='Seed every player\'s RNG (reproducible unless --workers > 1)')
+    sub_tourney.add_argument('--search-cache', default=None, help=SEARCH_CACHE_HELP)
+    sub_tourney.add_argument('--trajectories', action='store_true',
+                             help='Also write each game\'s move sequence to OUT.traj')
+
+    sub_traj = sub.add_parser('traj')
+    sub_traj.add_argument('trajfile')
+    sub_traj.add_argument('--top', type=int, default=10, help='Most frequent trajectories to list')
+
+    sub_bench = sub.add_parser('bench')
+    sub_bench.add_argument('--size', type=int, default=4, help='Board size n (n in a row wins)')
+    sub_bench.add_argument('--fill', type=int, default=6, help='Random stones placed before searching')
+    sub_bench.add_argument('--positions', type=int, default=3)
+    sub_bench.add_argument('--workers', '-w', type=int, default=None)
+    sub_bench.add_argument('--seed', type=int, default=0)
+
+    sub_bench_engine = sub.add_parser('bench-engine')
+    sub_bench_engine.add_argument('--boards', type=int, default=100000)
+    sub_bench_engine.add_argument('--size', type=int, default=3, help='Board size n (n in a row wins)')
+    sub_bench_engine.add_argument('--seed', type=int, default=0)
+
+    sub_bench_search = sub.add_parser('bench-search')
+    sub_bench_search.add_argument('--sizes', default='3,4,5', help='Board sizes n (n in a row wins)')
+    sub_bench_search.add_argument('--positions', type=int, default=5, help='Positions per board size')
+    sub_bench_search.add_argument('--fill', type=int, default=None,
+                                  help='Random stones placed first (default: leave 10 cells empty)')
+    sub_bench_search.add_argument('--depth', type=int, default=None,
+                                  help='Plies searched (default: to the end of the game)')
+    sub_bench_search.add_argument('--algos', default=','.join(ALGORITHMS),
+                                  help=f'Comma-separated subset of: {", ".join(ALGORITHMS)}')
+    sub_bench_search.add_argument('--seed', type=int, default=0)
+
+    sub_export = sub.add_parser('export-positions')
+    sub_export.add_argument('out_dir')
+    sub_export.add_argument('--rows', type=int, default=3)
+    sub_export.add_argument('--cols', type=int, default=3)
+    sub_export.add_argument('--k', type=int, default=3, help='Marks in a row needed to win')
+    sub_export.add_argument('--depth', type=int, default=None, help='Only positions up to this many plies')
+    sub_export.add_argument('--horizon', type=int, default=None,
+                            help='Search depth when solving; deeper results are marked inexact')
+    sub_export.add_argument('--dedupe', action='store_true', help='One position per symmetry class')
+    sub_export.add_argument('--workers', '-w', type=int, default=1)
+
+    sub_solve = sub.add_parser('solve')
+    sub_solve.add_argument('--rows', type=int, default=4)
+    sub_solve.add_argument('--cols', type=int, default=4)
+    sub_solve.add_argument('--k', type=int, default=4, help='Marks in a row needed to win')
+    sub_solve.add_argument('--position', default=None,
+                           help='Start position as rows like "X.../.O../..../....", default empty')
+    sub_solve.add_argument('--to-move', choices=['X', 'O'], default=None,
+                           help='Side to move (default: X if both have played equally often)')
+    sub_solve.add_argument('--max-nodes', type=int, default=None, help='Give up after this many nodes')
+    sub_solve.add_argument('--tt-size', type=int, default=2000000,
+                           help='Transposition table entries kept before garbage collection')
+    sub_solve.add_argument('--no-symmetry', action='store_true', help='Do not merge symmetric positions')
+    sub_solve.add_argument('--dump', default=None, help='Write solved positions to this directory')
+
+    sub_verify = sub.add_parser('verify')
+    sub_verify.add_argument('--checks', default=','.join(CHECKS),
+                            help=f'Comma-separated subset of: {", ".join(CHECKS)}')
+    sub_verify.add_argument('--random-sizes', default='4,5',
+                            help='Larger board sizes to check the engine on with random positions')
+    sub_verify.add_argument('--random', type=int, default=2000, help='Random positions per size')
+    sub_verify.add_argument('--parallel-sample', type=int, default=300,
+                            help='Positions searched by get_move_parallel')
+    sub_verify.add_argument('--workers', '-w', type=int, default=None)
+    sub_verify.add_argument('--seed', type=int, default=0)
 
     sub_plot = sub.add_parser('plot')
     sub_plot.add_argument('csvfile')
     sub_plot.add_argument('--out', '-o', default='plots')
+    sub_plot.add_argument('--workers', '-w', type=int, default=None,
+                          help='Render processes (default: one per CPU)')
 
     args = parser.parse_args()
     if args.cmd is None:
         parser.print_help()
         sys.exit(1)
 
+    # Set in the environment so GUI subprocesses and tournament workers share it
+    if getattr(args, 'search_cache', None):
+        os.environ[SEARCH_CACHE_ENV] = args.search_cache
+
     if args.cmd == 'gui':
-        subprocess.run([sys.executable, './src/tictactoe_pygame.py'])
+        if args.game == 'ultimate':
+            subprocess.run([sys.executable, './src/ultimate/gui.py'])
+        else:
+            subprocess.run([sys.executable, './src/tictactoe_pygame.py'])
 
     elif args.cmd == 'tourney':
         if args.pairs:
@@ -205,13 +555,128 @@ def cli():
                 a, b = part.split(',')
                 pairs.append((int(a), int(b)))
         else:
-            levels = sorted(AI_MODULES.keys())
-            pairs = [(a, b) for a in levels for b in levels]
-        run_tournament(pairs, args.games, args.out, start_mode=args.start)
-        print(f'Tournament finished -> {args.out}')
+            game_levels = levels(args.game)
+            pairs = [(a, b) for a in game_levels for b in game_levels]
+        if args.trajectories and args.game != 'classic':
+            parser.error('--trajectories is only supported for the classic game')
+        traj_path = args.out + '.traj' if args.trajectories else None
+        time_controls = parse_time_controls(args.time_control) if args.time_control else None
+        stats = run_tournament(pairs, args.games, args.out, start_mode=args.start,
+                               batch_size=max(1, args.batch), traj_path=traj_path,
+                               time_controls=time_controls, status_path=args.status,
+                               status_interval=args.status_interval, game=args.game,
+                               workers=max(1, args.workers), schedule=args.schedule,
+                               seed=args.seed)
+        print(f'Tournament finished -> {args.out} in {stats["wall_s"]:.2f}s')
+        if args.workers > 1:
+            busy = ', '.join(f'{b:.2f}' for b in stats['worker_busy_s'])
+            print(f'{args.schedule} schedule: {stats["chunks"]} chunks, {stats["steals"]} steals, '
+                  f'worker busy s [{busy}]')
+            print(f'static sharding of the pairs list, estimated from measured game times: '
+                  f'{stats["static_estimate_s"]:.2f}s')
+        if traj_path:
+            print(f'Trajectories -> {traj_path}')
+
+    elif args.cmd == 'traj':
+        counts = trajectory_counts(args.trajfile)
+        total = sum(counts.values())
+        print(f'{total} games, {len(counts)} distinct trajectories')
+        for code, n in counts.most_common(args.top):
+            cells = ' '.join(f'{r},{c}' for r, c in decode(code))
+            print(f'{n:8d}  {n / total * 100:5.1f}%  {cells}')
+
+    elif args.cmd == 'bench':
+        serial_total = parallel_total = 0.0
+        for i in range(args.positions):
+            board, player = random_position(args.size, args.fill, seed=args.seed + i)
+            r = bench_parallel(board, player, workers=args.workers)
+            serial_total += r['serial_s']
+            parallel_total += r['parallel_s']
+            same = 'same move' if r['serial_move'] == r['parallel_move'] else 'MOVES DIFFER'
+            print(f"position {i}: serial {r['serial_s']:.3f}s  parallel {r['parallel_s']:.3f}s  "
+                  f"speedup {r['speedup']:.2f}x  ({same})")
+        print(f'total: serial {serial_total:.3f}s  parallel {parallel_total:.3f}s  '
+              f'speedup {serial_total / parallel_total:.2f}x')
+
+    elif args.cmd == 'bench-engine':
+        boards = random_boards(args.boards, args.size, seed=args.seed)
+        for name, (scalar_s, batch_s) in bench_engine(boards).items():
+            if not scalar_s:
+                print(f'{name:12s} batch {batch_s:.4f}s')
+                continue
+            print(f'{name:12s} scalar {scalar_s:.4f}s ({len(boards) / scalar_s:,.0f}/s)  '
+                  f'batch {batch_s:.4f}s ({len(boards) / batch_s:,.0f}/s)  '
+                  f'speedup {scalar_s / batch_s:.1f}x')
+
+    elif args.cmd == 'bench-search':
+        algos = [a.strip() for a in args.algos.split(',') if a.strip()]
+        unknown = set(algos) - set(ALGORITHMS)
+        if unknown:
+            parser.error(f'unknown algorithms: {", ".join(sorted(unknown))}')
+        for size in [int(n) for n in args.sizes.split(',') if n.strip()]:
+            fill = args.fill if args.fill is not None else max(2, size * size - 10)
+            totals = bench_search(size, args.positions, fill, args.depth, algos, args.seed)
+            print(f'{size}x{size}, {args.positions} positions with {fill} stones, '
+                  f'depth {args.depth or "to the end"}:')
+            reference = totals[algos[0]]['scores']
+            for algo, t in totals.items():
+                agree = 'same scores' if t['scores'] == reference else 'SCORES DIFFER'
+                print(f"  {algo:10s} {t['nodes']:9,d} nodes  {t['cutoffs']:8,d} cutoffs  "
+                      f"{t['tt_hits']:8,d} tt hits  ebf {t['ebf']:5.2f}  {t['seconds']:7.3f}s  "
+                      f"({t['nodes'] / max(t['seconds'], 1e-9):,.0f} nodes/s)  {agree}")
+            fastest = min(totals, key=lambda a: totals[a]['seconds'])
+            print(f'  fastest: {fastest}')
+
+    elif args.cmd == 'export-positions':
+        t0 = time.perf_counter()
+        n = export_positions(args.out_dir, args.rows, args.cols, args.k, max_depth=args.depth,
+                             horizon=args.horizon, dedupe=args.dedupe, workers=args.workers)
+        print(f'Exported {n} positions to {args.out_dir} in {time.perf_counter() - t0:.1f}s')
+
+    elif args.cmd == 'solve':
+        if min(args.rows, args.cols, args.k) < 1:
+            parser.error('--rows, --cols and --k must be at least 1')
+        cells = args.rows * args.cols
+        pos = (0,) * cells
+        if args.position:
+            text = args.position.replace('/', '')
+            bad = sorted(set(text) - set('.XO'))
+            if bad:
+                parser.error(f'--position may only contain ".", "X", "O" and "/", got {"".join(bad)!r}')
+            pos = tuple('.XO'.index(ch) for ch in text)
+            if len(pos) != cells:
+                parser.error(f'--position has {len(pos)} cells, expected {cells}')
+        to_move = {'X': 1, 'O': 2}.get(args.to_move) or (1 if pos.count(1) == pos.count(2) else 2)
+        solver = DFPNSolver(args.rows, args.cols, args.k, tt_size=args.tt_size,
+                            symmetry=not args.no_symmetry, max_nodes=args.max_nodes)
+        try:
+            value = solver.solve(pos, to_move)
+        except ValueError as exc:
+            parser.error(f'--position: {exc}')
+        side = 'X' if to_move == 1 else 'O'
+        result = {1: f'{side} (to move) wins', 0: 'draw', -1: f'{side} (to move) loses',
+                  None: 'unknown (node limit reached)'}[value]
+        print(f'{args.rows}x{args.cols}, k={args.k}: {result}')
+        print(f'{solver.nodes:,} nodes in {solver.seconds:.2f}s '
+              f'({solver.nodes / max(solver.seconds, 1e-9):,.0f} nodes/s), '
+              f'{len(solver.tt):,} table entries, {solver.gc_runs} garbage collections')
+        if args.dump:
+            n = solver.dump(args.dump)
+            print(f'Dumped {n} solved positions to {args.dump}')
+
+    elif args.cmd == 'verify':
+        checks = [c.strip() for c in args.checks.split(',') if c.strip()]
+        unknown = set(checks) - set(CHECKS)
+        if unknown:
+            parser.error(f'unknown checks: {", ".join(sorted(unknown))}')
+        sizes = [int(n) for n in args.random_sizes.split(',') if n.strip()]
+        results = run_checks(checks, random_sizes=sizes, random_count=args.random, seed=args.seed,
+                             parallel_sample=args.parallel_sample, workers=args.workers)
+        if report(results):
+            sys.exit(1)
 
     elif args.cmd == 'plot':
-        improved_plots(args.csvfile, out_prefix=args.out)
+        improved_plots(args.csvfile, out_prefix=args.out, workers=args.workers)
 
 
 if __name__ == '__main__':
@@ -5,8 +5,17 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from tictactoe_engine import available_moves
 
 
-def get_move(board, player):
+def get_move(board, player, rng=random):
     moves = available_moves(board)
     if not moves:
         return None
-    return random.choice(moves)
+    return rng.choice(moves)
+
+
+def get_moves(boards, players, rng=random):
+    choice = rng.choice
+    picks = []
+    for board in boards:
+        moves = available_moves(board)
+        picks.append(choice(moves) if moves else None)
+    return picks
@@ -4,6 +4,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from tictactoe_engine import (
     available_moves,
     apply_move,
+    board_key,
     is_legal_move,
     new_board,
     check_winner,
@@ -15,6 +16,11 @@ from tictactoe_engine import (
     EMPTY,
 )
 import random
+from functools import lru_cache
+
+# Positions kept in the candidate cache. Every position reachable with either
+# side moving first fits, so in practice nothing is ever evicted.
+CACHE_SIZE = 16384
 
 
 def find_winning_move(board, player):
@@ -32,35 +38,100 @@ def find_winning_move(board, player):
 # 3. Take center if available
 # 4. Prefer corners
 # 5. Otherwise pick a random available move
-def get_move(board, player):
+def get_move(board, player, rng=random):
+    choices, randomize = candidate_moves(board, player)
+    if not choices:
+        return None
+    if randomize:
+        return rng.choice(choices)
+    return choices[0]
+
+
+def get_moves(boards, players, rng=random):
+    choice = rng.choice
+    picks = []
+    for board, player in zip(boards, players):
+        choices, randomize = candidate_moves(board, player)
+        if not choices:
+            picks.append(None)
+        elif randomize:
+            picks.append(choice(choices))
+        else:
+            picks.append(choices[0])
+    return picks
+
+
+def candidate_moves(board, player):
+    """Return (choices, randomize): the move set get_move picks from.
+
+    When `randomize` is False the single choice is played without touching
+    the RNG, matching the win/block/center shortcuts. Results are cached
+    per position; see cache_info().
+    """
+    return _cached_candidates(board_key(board), player)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached_candidates(key, player):
+    return compute_candidates([list(row) for row in key], player)
+
+
+def cache_info():
+    return _cached_candidates.cache_info()
+
+
+def cache_clear():
+    _cached_candidates.cache_clear()
+
+
+def build_table():
+    # Fill the cache with every position reachable from an empty board,
+    # whichever side moves first, so play never misses.
+    seen = set()
+    stack = [(new_board(), X), (new_board(), O)]
+    while stack:
+        board, player = stack.pop()
+        key = (board_key(board), player)
+        if key in seen:
+            continue
+        seen.add(key)
+        candidate_moves(board, player)
+        if is_terminal(board):
+            continue
+        for m in available_moves(board):
+            stack.append((apply_move(board, m, player), get_next_player(player)))
+    return len(seen)
+
+
+def compute_candidates(board, player):
     moves = available_moves(board)
     if not moves:
-        return None
+        return (), False
 
     # 1) Win
     win = find_winning_move(board, player)
     if win:
-        return win
+        return (win,), False
 
     # 2) Block opponent
     opponent = get_next_player(player)
     block = find_winning_move(board, opponent)
     if block:
-        return block
+        return (block,), False
 
     # 3) Center
     center = (1, 1)
     if is_legal_move(board, center):
-        return center
+        return (center,), False
 
     # 4) Corners preference
     corners = [(0, 0), (0, 2), (2, 0), (2, 2)]
     available_corners = [c for c in corners if is_legal_move(board, c)]
     if available_corners:
-        return random.choice(available_corners)
+        return tuple(available_corners), True
 
     # 5) Fallback to random edge or any move
-    return random.choice(moves)
+    return tuple(moves), True
 
 
 def print_board(board):
@@ -92,6 +163,8 @@ def human_move_prompt(board):
 
 
 if __name__ == "__main__":
+    from ponder import Ponderer
+
     print("Level 2 Heuristic Tic-Tac-Toe")
     board = new_board()
 
@@ -106,17 +179,24 @@ if __name__ == "__main__":
     ai = get_next_player(human)
     current = X
 
+    # Work out our replies while the human is typing
+    ponder = Ponderer()
+
     while not is_terminal(board):
         print()
         print_board(board)
         if current == human:
+            ponder.start(board, human, get_move)
             mv = human_move_prompt(board)
             if mv is None:
+                ponder.stop()
                 print("Quitting. Goodbye!")
                 break
             board = apply_move(board, mv, human)
         else:
-            mv = get_move(board, ai)
+            mv = ponder.take(board)
+            if mv is None:
+                mv = get_move(board, ai)
             print(f"AI ({ai}) chooses: {mv}")
             board = apply_move(board, mv, ai)
 
@@ -13,6 +13,10 @@ def copy_board(board):
     return [row[:] for row in board]
 
 
+def board_key(board):
+    return tuple(tuple(row) for row in board)
+
+
 def get_next_player(player):
     return O if player == X else X
 
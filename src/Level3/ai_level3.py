@@ -1,15 +1,21 @@
 import sys
 import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from tictactoe_engine import (
     available_moves,
     apply_move,
+    board_key,
     check_winner,
     is_tie,
     get_next_player,
     X,
     O,
 )
+from search_cache import default_cache, ENV_VAR as SEARCH_CACHE_ENV
+from Level3.search import Searcher
 
 
 def get_move(board, player):
@@ -21,6 +27,13 @@ def get_move(board, player):
     # If there's only one move, return it immediately
     if len(moves) == 1:
         return moves[0]
+
+    # Positions solved by an earlier run (see search_cache.py)
+    cache = default_cache()
+    if cache is not None:
+        hit = cache.get(board, player)
+        if hit is not None:
+            return hit[1]
     
     best_move = None
     best_score = float('-inf')
@@ -37,10 +50,25 @@ def get_move(board, player):
             best_move = move
         
         alpha = max(alpha, score)
-    
+
+    if cache is not None:
+        cache.put(board, player, best_score, best_move)
     return best_move
 
 
+def get_moves(boards, players):
+    # The search is deterministic, so each distinct position in the batch is
+    # solved once and every game sitting on it shares the answer.
+    solved = {}
+    picks = []
+    for board, player in zip(boards, players):
+        key = (board_key(board), player)
+        if key not in solved:
+            solved[key] = get_move(board, player)
+        picks.append(solved[key])
+    return picks
+
+
 def minimax(board, current_player, maximizing_player, alpha, beta, is_maximizing):
  
     # Check terminal conditions
@@ -110,3 +138,127 @@ def evaluate_move(board, move, player):
         float('inf'),
         False
     )
+
+
+def get_move_depth(board, player, depth=4, weights=None, k=None, algo='alphabeta'):
+    """Search `depth` plies with one of the algorithms in Level3/search.py,
+    scoring the leaves with evaluator.LineEvaluator.
+
+    For boards too big to solve outright. Wins found within the horizon are
+    exact (a quicker win scores higher); anything else is an estimate.
+    """
+    return Searcher(algo, depth, weights, k).search(board, player)['move']
+
+
+# Parallel root split (Young Brothers Wait): the first root move is searched
+# here to get a bound, then the remaining root subtrees go to a persistent
+# process pool. Workers share the best root score found so far, so later
+# subtrees start with a tighter alpha and still get cut off.
+_pool = None
+_pool_workers = 0
+_shared_alpha = None
+
+
+def _init_worker(shared_alpha):
+    global _shared_alpha
+    _shared_alpha = shared_alpha
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers, _shared_alpha
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _shared_alpha = mp.Value('d', float('-inf'))
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(_shared_alpha,))
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def _search_root_move(board, move, player):
+    alpha = _shared_alpha.value
+    score = minimax(apply_move(board, move, player), get_next_player(player), player,
+                    alpha, float('inf'), False)
+    exact = score > alpha
+    if exact:
+        with _shared_alpha.get_lock():
+            if score > _shared_alpha.value:
+                _shared_alpha.value = score
+    return score, exact
+
+
+def get_move_parallel(board, player, workers=None):
+    """Same move as get_move, with root moves searched across processes.
+
+    Only one parallel search may run at a time (the alpha bound is shared).
+    """
+    moves = available_moves(board)
+    if not moves:
+        return None
+    if len(moves) == 1:
+        return moves[0]
+    cache = default_cache()
+    if cache is not None:
+        hit = cache.get(board, player)
+        if hit is not None:
+            return hit[1]
+
+    pool = _get_pool(workers or os.cpu_count() or 1)
+    first = minimax(apply_move(board, moves[0], player), get_next_player(player), player,
+                    float('-inf'), float('inf'), False)
+    _shared_alpha.value = first
+    futures = [pool.submit(_search_root_move, board, m, player) for m in moves[1:]]
+    results = [(first, True)] + [f.result() for f in futures]
+
+    # The serial loop plays the first move reaching the best score. A move
+    # that failed low against a bound equal to the best may still tie it,
+    # so such moves are re-searched (in order) until one proves it.
+    best = max(score for score, _ in results)
+    for move, (score, exact) in zip(moves, results):
+        if score != best:
+            continue
+        if exact or _evaluate_window(board, move, player, best - 1) == best:
+            if cache is not None:
+                cache.put(board, player, best, move)
+            return move
+
+
+def _evaluate_window(board, move, player, alpha):
+    return minimax(apply_move(board, move, player), get_next_player(player), player,
+                   alpha, float('inf'), False)
+
+
+def bench_parallel(board, player, workers=None):
+    """Time serial vs parallel search on `board`; returns a dict of results.
+
+    The search cache is off for both runs, or the second would only be
+    looking up the first one's answer.
+    """
+    saved = os.environ.pop(SEARCH_CACHE_ENV, None)
+    try:
+        t0 = time.perf_counter()
+        serial_move = get_move(board, player)
+        serial_s = time.perf_counter() - t0
+
+        _get_pool(workers or os.cpu_count() or 1)
+        t0 = time.perf_counter()
+        parallel_move = get_move_parallel(board, player, workers)
+        parallel_s = time.perf_counter() - t0
+    finally:
+        if saved is not None:
+            os.environ[SEARCH_CACHE_ENV] = saved
+
+    return {
+        'serial_move': serial_move,
+        'parallel_move': parallel_move,
+        'serial_s': serial_s,
+        'parallel_s': parallel_s,
+        'speedup': serial_s / parallel_s if parallel_s > 0 else float('inf'),
+    }
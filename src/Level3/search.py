@@ -0,0 +1,184 @@
+"""Selectable game-tree search algorithms for Level 3.
+
+Every algorithm is negamax over the incremental evaluator.LineEvaluator,
+sharing one transposition table per Searcher:
+
+  alphabeta   alpha-beta with a full window
+  pvs         principal variation search: the first move gets the full
+              window, the rest a null window, re-searched if they beat it
+  aspiration  iterative deepening; each depth starts with a window of
+              +-`window` around the previous depth's score and only widens
+              when the score falls outside it
+  mtdf        iterative deepening; each depth converges on the score with
+              null-window searches, starting from the previous depth's score
+
+With depth=None the search runs to the end of the game and the score is
+exact: a win scores win + the empty cells left (quicker wins score more),
+a draw 0. With a depth the positions at the horizon are scored by the
+evaluator.
+
+    searcher = Searcher('mtdf')
+    result = searcher.search(board, player)
+    result['move'], result['nodes'], result['ebf']
+
+search() returns the move, its score and the search's statistics: nodes
+visited, beta cutoffs, transposition table hits, effective branching
+factor (nodes ** (1 / deepest ply)) and seconds.
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from evaluator import LineEvaluator, CODES
+
+ALGORITHMS = ('alphabeta', 'pvs', 'aspiration', 'mtdf')
+INF = 10 ** 9
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class Searcher:
+    def __init__(self, algo='pvs', depth=None, weights=None, k=None, window=50, tt_size=1000000):
+        if algo not in ALGORITHMS:
+            raise ValueError(f'unknown search algorithm {algo!r}, expected one of {ALGORITHMS}')
+        self.algo = algo
+        self.depth = depth
+        self.weights = weights
+        self.k = k
+        self.window = window
+        self.tt_size = tt_size
+        self.tt = {}        # (cells, mark) -> (depth, flag, score, best cell)
+        self.ev = None
+        self._null_window = algo == 'pvs'
+
+    def clear(self):
+        self.tt.clear()
+
+    def search(self, board, player):
+        """Best move for `player` on `board` (None if the game is over) plus
+        the search statistics."""
+        if len(self.tt) > self.tt_size:
+            self.tt.clear()
+        self.ev = ev = LineEvaluator.from_board(board, k=self.k, weights=self.weights)
+        self.nodes = self.cutoffs = self.tt_hits = self.max_ply = 0
+        mark = CODES[player]
+        empty = len(ev.cells) - ev.placed
+        depth = empty if self.depth is None else max(1, min(self.depth, empty))
+        move = score = None
+        t0 = time.perf_counter()
+        if not ev.winner and empty:
+            score, cell = getattr(self, '_' + self.algo)(mark, depth)
+            move = divmod(cell, ev.cols)
+        seconds = time.perf_counter() - t0
+        return {
+            'algo': self.algo,
+            'move': move,
+            'score': score,
+            'depth': depth,
+            'nodes': self.nodes,
+            'cutoffs': self.cutoffs,
+            'tt_hits': self.tt_hits,
+            'ebf': self.nodes ** (1 / self.max_ply) if self.max_ply else 0.0,
+            'seconds': seconds,
+        }
+
+    def _root(self, mark, depth, alpha, beta):
+        # (score, move) of the root; unlike _negamax it never stops at a table hit
+        self.nodes += 1
+        key = (tuple(self.ev.cells), mark)
+        return self._moves(mark, depth, alpha, beta, 0, key, self.tt.get(key))
+
+    def _alphabeta(self, mark, depth):
+        return self._root(mark, depth, -INF, INF)
+
+    def _pvs(self, mark, depth):
+        return self._root(mark, depth, -INF, INF)
+
+    def _aspiration(self, mark, depth):
+        guess = 0
+        for d in range(1, depth + 1):
+            alpha, beta = guess - self.window, guess + self.window
+            while True:
+                score, cell = self._root(mark, d, alpha, beta)
+                if score <= alpha:
+                    alpha = -INF
+                elif score >= beta:
+                    beta = INF
+                else:
+                    break
+            guess = score
+        return score, cell
+
+    def _mtdf(self, mark, depth):
+        guess = 0
+        for d in range(1, depth + 1):
+            lower, upper = -INF, INF
+            score = guess
+            while lower < upper:
+                beta = score + 1 if score == lower else score
+                score, cell = self._root(mark, d, beta - 1, beta)
+                if score < beta:
+                    upper = score
+                else:
+                    # Only a fail-high proves its move reaches the score
+                    lower, best = score, cell
+            guess = score
+        return guess, best
+
+    def _negamax(self, mark, depth, alpha, beta, ply):
+        ev = self.ev
+        self.nodes += 1
+        if ply > self.max_ply:
+            self.max_ply = ply
+        if ev.winner:
+            # The side that just moved has won
+            return -(ev.win + len(ev.cells) - ev.placed)
+        if ev.full():
+            return 0
+        if depth <= 0:
+            return ev.evaluate(mark)
+
+        key = (tuple(ev.cells), mark)
+        entry = self.tt.get(key)
+        if entry is not None:
+            e_depth, flag, score, _ = entry
+            if e_depth >= depth and (flag == EXACT or (flag == LOWER and score >= beta)
+                                     or (flag == UPPER and score <= alpha)):
+                self.tt_hits += 1
+                return score
+        return self._moves(mark, depth, alpha, beta, ply, key, entry)[0]
+
+    def _moves(self, mark, depth, alpha, beta, ply, key, entry):
+        # Search every move from the current position; returns (best score, best move)
+        ev = self.ev
+        moves = ev.empty_cells()
+        if entry is not None:
+            # Try the stored best move first
+            moves.remove(entry[3])
+            moves.insert(0, entry[3])
+
+        alpha_0 = alpha
+        best, best_move = -INF, None
+        for i, cell in enumerate(moves):
+            ev.make(cell, mark)
+            if self._null_window and i:
+                score = -self._negamax(3 - mark, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self._negamax(3 - mark, depth - 1, -beta, -score, ply + 1)
+            else:
+                score = -self._negamax(3 - mark, depth - 1, -beta, -alpha, ply + 1)
+            ev.unmake()
+            if score > best:
+                best, best_move = score, cell
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.cutoffs += 1
+                        break
+
+        flag = UPPER if best <= alpha_0 else LOWER if best >= beta else EXACT
+        self.tt[key] = (depth, flag, best, best_move)
+        return best, best_move
+
+
+def get_move(board, player, algo='pvs', depth=None, weights=None, k=None):
+    return Searcher(algo, depth, weights, k).search(board, player)['move']
@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+from tictactoe_engine import (
+    available_moves,
+    apply_move,
+    check_winner,
+    is_tie,
+    X,
+    O,
+)
+
+# Learned player for Level 4: a table of position values trained by
+# self-play (see train.py). VALUES[side, code] is the expected result for X
+# (+1 win, -1 loss) of position `code` with `side` (0 = X, 1 = O) to move.
+# A position's code is its cells read as base-3 digits: 0 empty, 1 X, 2 O.
+SIZE = 3
+CELLS = SIZE * SIZE
+POWERS = 3 ** np.arange(CELLS, dtype=np.int64)
+WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weights.npy')
+
+
+def load_values(path=WEIGHTS_PATH):
+    if os.path.exists(path):
+        return np.load(path).astype(np.float32)
+    return np.zeros((2, 3 ** CELLS), dtype=np.float32)
+
+
+VALUES = load_values()
+
+
+def encode(board):
+    code = 0
+    for i, v in enumerate(cell for row in board for cell in row):
+        if v == X:
+            code += 1 * 3 ** i
+        elif v == O:
+            code += 2 * 3 ** i
+    return code
+
+
+def get_move(board, player):
+    moves = available_moves(board)
+    if not moves:
+        return None
+    if len(board) != SIZE or any(len(row) != SIZE for row in board):
+        raise ValueError(f'Level 4 is trained for {SIZE}x{SIZE} boards only, '
+                         f'got {len(board)}x{len(board[0])}')
+
+    code = encode(board)
+    digit = 1 if player == X else 2
+    side_next = 1 if player == X else 0
+    sign = 1 if player == X else -1
+    best_move = None
+    best_value = float('-inf')
+    for r, c in moves:
+        child = apply_move(board, (r, c), player)
+        w = check_winner(child)
+        if w is not None:
+            value = 1.0 if w == X else -1.0
+        elif is_tie(child):
+            value = 0.0
+        else:
+            value = float(VALUES[side_next, code + digit * 3 ** (r * SIZE + c)])
+        if sign * value > best_value:
+            best_value = sign * value
+            best_move = (r, c)
+    return best_move
+
+
+def get_moves(boards, players):
+    return [get_move(board, player) for board, player in zip(boards, players)]
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Train the Level 4 value table by self-play.
+
+Many games run in lockstep as numpy arrays: every ply scores all children
+of all boards at once, plays epsilon-greedy, and moves each position's
+value towards its best child (Q-learning style, so the table learns the
+minimax value rather than the exploring policy). With --workers > 1 each
+round is played by several processes from the same table and their
+updates are averaged.
+
+Usage (from the repository root):
+  python -m src.Level4.train --rounds 40 --eval 200
+"""
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from src.Level4.ai_rl import CELLS, POWERS, SIZE, WEIGHTS_PATH, load_values
+from src.tictactoe_engine import batch_winners
+
+
+def self_play(values, games, plies, epsilon, lr, seed):
+    """Run `plies` lockstep plies over `games` boards; return (delta, finished)."""
+    rng = np.random.default_rng(seed)
+    values = values.copy()
+    start = values.copy()
+    boards = np.zeros((games, CELLS), dtype=np.int8)
+    side = rng.integers(0, 2, size=games)   # 0 = X to move, 1 = O to move
+    rows = np.arange(games)
+    eye = np.eye(CELLS, dtype=np.int8)
+    finished = 0
+
+    for _ in range(plies):
+        codes = boards.astype(np.int64) @ POWERS
+        digit = (side + 1).astype(np.int8)
+        empty = boards == 0
+
+        # All nine children of every board: (games, 9, 9)
+        children = boards[:, None, :] + eye[None, :, :] * digit[:, None, None]
+        child_codes = np.where(empty, codes[:, None] + POWERS[None, :] * digit[:, None], 0)
+        w = batch_winners(children, SIZE, SIZE, SIZE)
+        full = (children != 0).all(axis=-1)
+        child_values = values[(1 - side)[:, None], child_codes]
+        child_values = np.where(w == 1, 1.0, np.where(w == 2, -1.0, np.where(full, 0.0, child_values)))
+
+        # Score from the mover's point of view; illegal cells never win
+        sign = np.where(side == 0, 1.0, -1.0)[:, None]
+        scored = np.where(empty, sign * child_values, -np.inf)
+        greedy = scored.argmax(axis=1)
+        target = child_values[rows, greedy]
+
+        explore = rng.random(games) < epsilon
+        if explore.any():
+            noise = np.where(empty, rng.random((games, CELLS)), -1.0)
+            greedy = np.where(explore, noise.argmax(axis=1), greedy)
+
+        # Many games share a position (the empty board above all); average
+        # their targets so a crowded position is not updated once per game
+        flat = side * values.shape[1] + codes
+        error = np.bincount(flat, weights=target - values[side, codes], minlength=values.size)
+        count = np.bincount(flat, minlength=values.size)
+        seen = count > 0
+        values.reshape(-1)[seen] += lr * error[seen] / count[seen]
+
+        boards[rows, greedy] = digit
+        done = (w[rows, greedy] != 0) | full[rows, greedy]
+        finished += int(done.sum())
+        boards[done] = 0
+        side = np.where(done, rng.integers(0, 2, size=games), 1 - side)
+
+    return values - start, finished
+
+
+def _worker(args):
+    return self_play(*args)
+
+
+def train(rounds=40, games=2048, plies=90, epsilon=0.2, lr=0.3, workers=1, seed=0):
+    values = load_values()
+    total_games = 0
+    t0 = time.perf_counter()
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        for r in range(rounds):
+            jobs = [(values, games, plies, epsilon, lr, seed * 1000003 + r * workers + k)
+                    for k in range(workers)]
+            results = pool.map(_worker, jobs) if pool else [_worker(jobs[0])]
+            values += sum(delta for delta, _ in results) / len(results)
+            total_games += sum(n for _, n in results)
+    finally:
+        if pool:
+            pool.close()
+    elapsed = time.perf_counter() - t0
+    return values, total_games, elapsed
+
+
+def save_values(values, path=WEIGHTS_PATH):
+    # float16 keeps the table at ~77 KB; values only need to order moves
+    np.save(path, values.astype(np.float16))
+
+
+def evaluate(games):
+    """Play Level 4 against Level 3 from both sides; returns {'win','draw','loss'}."""
+    from main import AI_MODULES, play_games
+    from src.tictactoe_engine import X, O
+    tally = {'win': 0, 'draw': 0, 'loss': 0}
+    for me, (ai_X, ai_O) in ((X, (AI_MODULES[4], AI_MODULES[3])), (O, (AI_MODULES[3], AI_MODULES[4]))):
+        for start in (X, O):
+            for winner, _, _ in play_games(ai_X, ai_O, games // 4, starting_player=start):
+                if winner == 'Tie':
+                    tally['draw'] += 1
+                elif winner == me:
+                    tally['win'] += 1
+                else:
+                    tally['loss'] += 1
+    return tally
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=40)
+    parser.add_argument('--games', type=int, default=2048, help='Lockstep games per worker')
+    parser.add_argument('--plies', type=int, default=90, help='Plies per worker per round')
+    parser.add_argument('--epsilon', type=float, default=0.2)
+    parser.add_argument('--lr', type=float, default=0.3)
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fresh', action='store_true', help='Start from an empty table')
+    parser.add_argument('--eval', type=int, default=200, help='Games against Level 3 afterwards')
+    args = parser.parse_args()
+
+    if args.fresh and os.path.exists(WEIGHTS_PATH):
+        os.remove(WEIGHTS_PATH)
+    values, n, elapsed = train(args.rounds, args.games, args.plies, args.epsilon, args.lr,
+                               args.workers, args.seed)
+    save_values(values)
+    print(f'Trained on {n} self-play games in {elapsed:.1f}s ({n / elapsed:.0f} games/s)')
+    print(f'Saved {WEIGHTS_PATH}')
+
+    if args.eval:
+        # Reload so the player uses the table just written. The player imports
+        # Level4.ai_rl without the src. prefix, a separate module object.
+        for name in ('Level4.ai_rl', 'src.Level4.ai_rl'):
+            module = sys.modules.get(name)
+            if module is not None:
+                module.VALUES = load_values()
+        tally = evaluate(args.eval)
+        print(f"vs Level 3: {tally['win']} wins, {tally['draw']} draws, {tally['loss']} losses")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""Differential checks between reference and optimized implementations.
+
+Corpus: every position reachable on the 3x3 board (either side moving
+first), plus seeded random positions on larger boards. Each check runs a
+reference implementation and its alternatives over the same positions,
+compares their answers position by position and times each of them, so
+one run reports both correctness and speed.
+
+Checks:
+  engine   check_winner / is_tie / available_moves: the engine, the Level 2
+           copy of the engine (3x3 only) and the numpy batch functions
+  level1   get_moves vs repeated get_move from the same seed
+  level2   move distribution of compute_candidates vs the cached
+           candidate_moves, and get_moves vs get_move from the same seed
+  level3   get_move vs get_move_parallel (on a sample) and vs a warm
+           on-disk search cache
+  search   game value of the move each Level3/search.py algorithm plays
+           vs the value of get_move's move (equal moves may differ)
+
+A divergence is reported with the smallest diverging board (fewest marks).
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from fractions import Fraction
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import tictactoe_engine as engine
+from tictactoe_engine import (
+    available_moves,
+    apply_move,
+    board_key,
+    is_terminal,
+    new_board,
+    get_next_player,
+    X,
+    O,
+)
+
+
+def reachable_positions(size=3):
+    """Every (board, player to move) reachable from the empty board, with
+    either side moving first, terminal positions included."""
+    seen = {}
+    stack = [(new_board(size), X), (new_board(size), O)]
+    while stack:
+        board, player = stack.pop()
+        key = (board_key(board), player)
+        if key in seen:
+            continue
+        seen[key] = (board, player)
+        if is_terminal(board):
+            continue
+        for m in available_moves(board):
+            stack.append((apply_move(board, m, player), get_next_player(player)))
+    return [seen[k] for k in sorted(seen, key=lambda k: (_marks(k[0]), format_board(k[0]), k[1]))]
+
+
+def random_positions(size, count, seed=0):
+    """`count` positions after random play of random length, seeded."""
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(count):
+        board = new_board(size)
+        player = rng.choice((X, O))
+        for _ in range(rng.randrange(size * size + 1)):
+            if is_terminal(board):
+                break
+            board = apply_move(board, rng.choice(available_moves(board)), player)
+            player = get_next_player(player)
+        positions.append((board, player))
+    return positions
+
+
+def _marks(board):
+    return sum(cell is not None for row in board for cell in row)
+
+
+def format_board(board):
+    return '/'.join(''.join(cell or '.' for cell in row) for row in board)
+
+
+def compare(name, positions, reference, candidates):
+    """Run `reference` and each (impl name, run) in `candidates` on
+    `positions`; run(positions) returns one comparable answer per position.
+
+    Returns one result dict per implementation, the reference first.
+    """
+    t0 = time.perf_counter()
+    expected = reference[1](positions)
+    ref_s = time.perf_counter() - t0
+    results = [{'check': name, 'impl': reference[0], 'positions': len(positions),
+                'seconds': ref_s, 'divergences': 0, 'minimal': None}]
+    for impl, run in candidates:
+        t0 = time.perf_counter()
+        got = run(positions)
+        seconds = time.perf_counter() - t0
+        bad = [(pos, want, have) for pos, want, have in zip(positions, expected, got) if want != have]
+        minimal = min(bad, key=lambda b: (_marks(b[0][0]), format_board(b[0][0]))) if bad else None
+        results.append({'check': name, 'impl': impl, 'positions': len(positions), 'seconds': seconds,
+                        'divergences': len(bad), 'minimal': minimal, 'reference_s': ref_s})
+    return results
+
+
+def _scalar_engine(module):
+    def run(positions):
+        return [(module.check_winner(b), module.is_tie(b), module.available_moves(b))
+                for b, _ in positions]
+    return run
+
+
+def _batch_engine(positions):
+    arr = engine.to_array([b for b, _ in positions])
+    winners = engine.batch_winners(arr)
+    full = (arr != 0).all(axis=-1)
+    legal = engine.batch_legal(arr)
+    n = len(positions[0][0])
+    answers = []
+    for w, f, mask in zip(winners.tolist(), full.tolist(), legal.tolist()):
+        moves = [divmod(i, n) for i in range(n * n) if mask >> i & 1]
+        answers.append((engine.MARKS[w], w == 0 and f, moves))
+    return answers
+
+
+def check_engine(corpora):
+    import Level2.tictactoe_engine as level2_engine
+    results = []
+    for size, positions in corpora.items():
+        candidates = [('batch (numpy)', _batch_engine)]
+        if size == level2_engine.GRID_SIZE:
+            candidates.insert(0, ('Level2 copy', _scalar_engine(level2_engine)))
+        results += compare(f'engine {size}x{size}', positions,
+                           ('engine', _scalar_engine(engine)), candidates)
+    return results
+
+
+def _sequential(get_move, seed):
+    def run(positions):
+        rng = random.Random(seed)
+        return [get_move(b, p, rng=rng) for b, p in positions]
+    return run
+
+
+def _batched(get_moves, seed):
+    def run(positions):
+        return get_moves([b for b, _ in positions], [p for _, p in positions],
+                         rng=random.Random(seed))
+    return run
+
+
+def _live(positions):
+    return [(b, p) for b, p in positions if not is_terminal(b)]
+
+
+def check_level1(positions, seed=0):
+    import Level1.ai_player as ai1
+    positions = _live(positions)
+    return compare('level1 moves', positions, ('get_move', _sequential(ai1.get_move, seed)),
+                   [('get_moves', _batched(ai1.get_moves, seed))])
+
+
+def _distribution(candidates):
+    def run(positions):
+        answers = []
+        for b, p in positions:
+            choices, randomize = candidates(b, p)
+            if not randomize:
+                choices = choices[:1]
+            answers.append({m: Fraction(1, len(choices)) for m in choices})
+        return answers
+    return run
+
+
+def check_level2(positions, seed=0):
+    import Level2.start as ai2
+    positions = _live(positions)
+    ai2.cache_clear()
+    return (compare('level2 distribution', positions,
+                    ('compute_candidates', _distribution(ai2.compute_candidates)),
+                    [('candidate_moves (cached)', _distribution(ai2.candidate_moves))])
+            + compare('level2 moves', positions, ('get_move', _sequential(ai2.get_move, seed)),
+                      [('get_moves', _batched(ai2.get_moves, seed))]))
+
+
+def check_level3(positions, parallel_sample=300, workers=None, seed=0):
+    import Level3.ai_level3 as ai3
+    import search_cache
+    positions = _live(positions)
+    saved = os.environ.pop(search_cache.ENV_VAR, None)
+    try:
+        def serial(ps):
+            return [ai3.get_move(b, p) for b, p in ps]
+
+        def parallel(ps):
+            return [ai3.get_move_parallel(b, p, workers) for b, p in ps]
+
+        sample = positions
+        if parallel_sample is not None and parallel_sample < len(positions):
+            sample = random.Random(seed).sample(positions, parallel_sample)
+        results = compare('level3 parallel', sample, ('get_move', serial), [('get_move_parallel', parallel)])
+        ai3.shutdown_pool()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ[search_cache.ENV_VAR] = os.path.join(tmp, 'search.db')
+            serial(positions)                       # cold pass fills the file
+            search_cache.default_cache().close()
+            search_cache._default = None            # reopen: answers now come from disk
+            results += compare('level3 cache', positions, ('get_move', _uncached(serial)),
+                               [('search cache (warm)', serial)])
+            search_cache.default_cache().close()
+            search_cache._default = None
+    finally:
+        os.environ.pop(search_cache.ENV_VAR, None)
+        if saved is not None:
+            os.environ[search_cache.ENV_VAR] = saved
+    return results
+
+
+def _uncached(run):
+    import search_cache
+
+    def uncached(positions):
+        path = os.environ.pop(search_cache.ENV_VAR)
+        try:
+            return run(positions)
+        finally:
+            os.environ[search_cache.ENV_VAR] = path
+    return uncached
+
+
+def _value(board, player, memo):
+    # Exact minimax value for `player` to move: 1 win, 0 draw, -1 loss
+    key = (board_key(board), player)
+    if key not in memo:
+        if engine.check_winner(board) is not None:
+            memo[key] = -1          # the side that just moved has won
+        elif engine.is_tie(board):
+            memo[key] = 0
+        else:
+            memo[key] = max(-_value(apply_move(board, m, player), get_next_player(player), memo)
+                            for m in available_moves(board))
+    return memo[key]
+
+
+def _move_values(get_move, memo):
+    def run(positions):
+        return [-_value(apply_move(b, m, p), get_next_player(p), memo)
+                for b, p in positions for m in [get_move(b, p)]]
+    return run
+
+
+def check_search(positions):
+    import Level3.ai_level3 as ai3
+    from Level3.search import Searcher, ALGORITHMS
+    positions = _live(positions)
+    memo = {}
+    _move_values(ai3.get_move, memo)(positions)       # fill the value table untimed
+    candidates = []
+    for algo in ALGORITHMS:
+        # One searcher for all positions, so its table carries over as in play
+        searcher = Searcher(algo)
+        candidates.append((algo, _move_values(lambda b, p, s=searcher: s.search(b, p)['move'], memo)))
+    return compare('level3 search', positions, ('get_move', _move_values(ai3.get_move, memo)),
+                   candidates)
+
+
+CHECKS = ('engine', 'level1', 'level2', 'level3', 'search')
+
+
+def run_checks(checks=CHECKS, random_sizes=(4, 5), random_count=2000, seed=0,
+               parallel_sample=300, workers=None):
+    positions = reachable_positions(3)
+    results = []
+    if 'engine' in checks:
+        corpora = {3: positions}
+        for size in random_sizes:
+            corpora[size] = random_positions(size, random_count, seed=seed + size)
+        results += check_engine(corpora)
+    if 'level1' in checks:
+        results += check_level1(positions, seed)
+    if 'level2' in checks:
+        results += check_level2(positions, seed)
+    if 'level3' in checks:
+        results += check_level3(positions, parallel_sample, workers, seed)
+    if 'search' in checks:
+        results += check_search(positions)
+    return results
+
+
+def report(results):
+    """Print a results table; returns the number of diverging implementations."""
+    failed = 0
+    for r in results:
+        rate = r['positions'] / r['seconds'] if r['seconds'] > 0 else float('inf')
+        line = f"{r['check']:22s} {r['impl']:26s} {r['positions']:6d} pos  {rate:12,.0f}/s"
+        if 'reference_s' not in r:
+            print(line + '  (reference)')
+            continue
+        speedup = r['reference_s'] / r['seconds'] if r['seconds'] > 0 else float('inf')
+        status = 'ok' if not r['divergences'] else f"{r['divergences']} DIVERGENT"
+        print(f'{line}  {speedup:7.2f}x  {status}')
+        if r['minimal']:
+            failed += 1
+            (board, player), want, have = r['minimal']
+            print(f'    minimal: {format_board(board)} {player} to move: '
+                  f'expected {want!r}, got {have!r}')
+    return failed
@@ -0,0 +1,130 @@
+"""Incremental line-count evaluation for depth-limited search.
+
+LineEvaluator keeps, for every k-in-a-row line, how many X and O marks it
+holds, and for each side a histogram of its open lines (lines the opponent
+has not touched) by mark count. make() and unmake() only visit the lines
+through the cell played, so after each move:
+
+  - a win is open[mark][k] > 0                 O(1)
+  - a threat (one move from a win) is open[mark][k - 1] > 0
+  - evaluate() is a weighted sum over the histogram, O(k)
+
+Weights (all from the point of view of the side to move):
+  open           {n: weight} per open line holding n own marks, minus the
+                 same for the opponent; default 10 ** (n - 1)
+  threat         bonus for having a threat when it is your move (you win
+                 next move, so it dominates everything but a win)
+  double_threat  penalty when the opponent has two or more threat lines
+                 (a fork, unless they all wait on the same cell)
+  win            value of a won position
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from tictactoe_engine import winning_lines, X, O, EMPTY
+
+DEFAULT_WEIGHTS = {
+    'open': None,
+    'threat': 50000,
+    'double_threat': 5000,
+    'win': 1000000,
+}
+CODES = {EMPTY: 0, X: 1, O: 2}
+
+
+class LineEvaluator:
+    def __init__(self, rows, cols, k, weights=None):
+        self.rows, self.cols, self.k = rows, cols, k
+        self.lines = winning_lines(rows, cols, k)
+        self.cell_lines = [[] for _ in range(rows * cols)]
+        for i, line in enumerate(self.lines):
+            for cell in line:
+                self.cell_lines[cell].append(i)
+        # Cells on more lines first: a cheap static move ordering
+        self.order = sorted(range(rows * cols), key=lambda c: -len(self.cell_lines[c]))
+
+        w = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        open_w = w['open'] or {}
+        self.open_weights = [0] + [open_w.get(n, 10 ** (n - 1)) for n in range(1, k + 1)]
+        self.threat_weight = w['threat']
+        self.double_threat_weight = w['double_threat']
+        self.win = w['win']
+
+        self.cells = [0] * (rows * cols)
+        self.count = [None, [0] * len(self.lines), [0] * len(self.lines)]
+        # open[mark][n]: lines with n marks of `mark` and none of the opponent
+        self.open = [None, [len(self.lines)] + [0] * k, [len(self.lines)] + [0] * k]
+        self.winner = 0
+        self.placed = 0
+        self.history = []
+
+    @classmethod
+    def from_board(cls, board, k=None, weights=None):
+        rows, cols = len(board), len(board[0])
+        ev = cls(rows, cols, k or min(rows, cols), weights)
+        for r, row in enumerate(board):
+            for c, v in enumerate(row):
+                if v is not EMPTY:
+                    ev.make(r * cols + c, CODES[v])
+        return ev
+
+    def make(self, cell, mark):
+        opp = 3 - mark
+        mine, theirs = self.count[mark], self.count[opp]
+        open_mine, open_theirs = self.open[mark], self.open[opp]
+        for i in self.cell_lines[cell]:
+            n, m = mine[i], theirs[i]
+            if m == 0:
+                open_mine[n] -= 1
+                open_mine[n + 1] += 1
+                if n + 1 == self.k:
+                    self.winner = mark
+            if n == 0:
+                open_theirs[m] -= 1      # the opponent's line is now blocked
+            mine[i] = n + 1
+        self.cells[cell] = mark
+        self.placed += 1
+        self.history.append((cell, mark, self.winner))
+
+    def unmake(self):
+        cell, mark, _ = self.history.pop()
+        opp = 3 - mark
+        mine, theirs = self.count[mark], self.count[opp]
+        open_mine, open_theirs = self.open[mark], self.open[opp]
+        for i in self.cell_lines[cell]:
+            n, m = mine[i] - 1, theirs[i]
+            mine[i] = n
+            if m == 0:
+                open_mine[n + 1] -= 1
+                open_mine[n] += 1
+            if n == 0:
+                open_theirs[m] += 1
+        self.cells[cell] = 0
+        self.placed -= 1
+        self.winner = self.history[-1][2] if self.history else 0
+
+    def full(self):
+        return self.placed == len(self.cells)
+
+    def empty_cells(self):
+        cells = self.cells
+        return [c for c in self.order if not cells[c]]
+
+    def threats(self, mark):
+        return self.open[mark][self.k - 1]
+
+    def evaluate(self, mark):
+        """Static score for `mark` to move (positive is good for `mark`)."""
+        opp = 3 - mark
+        if self.winner:
+            return self.win if self.winner == mark else -self.win
+        if self.threats(mark):
+            return self.threat_weight
+        mine, theirs = self.open[mark], self.open[opp]
+        weights = self.open_weights
+        score = 0
+        for n in range(1, self.k):
+            score += weights[n] * (mine[n] - theirs[n])
+        if theirs[self.k - 1] >= 2:
+            score -= self.double_threat_weight
+        return score
@@ -0,0 +1,78 @@
+"""Per-cell analysis for the GUI's hint overlay.
+
+analyze() gives every empty cell its game-theoretic result for the side to
+move (win/draw/loss) and how many plies the game lasts from that move with
+best play. Results are memoized by position, and HintCache computes them
+on a background thread so the frame loop never waits on a search.
+"""
+import sys
+import os
+import threading
+from functools import lru_cache
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from tictactoe_engine import (
+    available_moves,
+    apply_move,
+    board_key,
+    check_winner,
+    is_terminal,
+    is_tie,
+    get_next_player,
+)
+
+
+def _rank(result):
+    # Prefer wins, then draws; win fast, lose slowly
+    value, plies = result
+    return (value, -plies if value > 0 else plies)
+
+
+def _after(board, move, player):
+    child = apply_move(board, move, player)
+    if check_winner(child) == player:
+        return 1, 1
+    if is_tie(child):
+        return 0, 1
+    value, plies = _solve(board_key(child), get_next_player(player))
+    return -value, plies + 1
+
+
+@lru_cache(maxsize=None)
+def _solve(key, player):
+    board = [list(row) for row in key]
+    return max((_after(board, m, player) for m in available_moves(board)), key=_rank)
+
+
+def analyze(board, player):
+    """Return {move: (value, plies)} for `player` to move; {} if the game is over."""
+    if is_terminal(board):
+        return {}
+    return {m: _after(board, m, player) for m in available_moves(board)}
+
+
+class HintCache:
+    """Background, memoized analyze(); get() never blocks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}
+        self._pending = set()
+
+    def get(self, board, player):
+        """Return the analysis if ready, otherwise start it and return None."""
+        key = (board_key(board), player)
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+            if key in self._pending:
+                return None
+            self._pending.add(key)
+        threading.Thread(target=self._run, args=(key,), daemon=True).start()
+        return None
+
+    def _run(self, key):
+        board_k, player = key
+        result = analyze([list(row) for row in board_k], player)
+        with self._lock:
+            self._results[key] = result
+            self._pending.discard(key)
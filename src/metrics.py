@@ -0,0 +1,163 @@
+"""Live progress metrics for long tournament runs.
+
+The runner reports finished games in batches; a background thread writes
+the current numbers every `interval` seconds, so the file stays fresh even
+while a long batch is running. Writes are atomic (temp file + rename); the
+format is Prometheus text exposition if the path ends in .prom, JSON
+otherwise.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+
+# Upper bounds (seconds) of the game-duration histogram buckets: 16 per
+# doubling from 10 us to about 3 minutes, so a quantile is within ~4.4%
+BUCKETS = [1e-5 * 2 ** (i / 16) for i in range(24 * 16)]
+
+
+class _Series:
+    def __init__(self):
+        self.games = 0
+        self.busy = 0.0
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.first = None       # when its first batch started playing
+        self.last = None        # when its latest batch was reported
+
+    def add(self, durations, now):
+        counts = self.counts
+        for d in durations:
+            counts[bisect.bisect_left(BUCKETS, d)] += 1
+        self.games += len(durations)
+        busy = sum(durations)
+        self.busy += busy
+        # A batch's games run back to back, so it started `busy` seconds ago
+        start = now - busy
+        self.first = start if self.first is None else min(self.first, start)
+        self.last = now
+
+    def wall(self):
+        return self.last - self.first if self.games else 0.0
+
+    def quantile(self, q):
+        if not self.games:
+            return 0.0
+        target = q * self.games
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                break
+        # Games slower than the top bucket report its bound
+        return BUCKETS[min(i, len(BUCKETS) - 1)]
+
+    def summary(self, elapsed):
+        return {
+            'games': self.games,
+            'games_per_s': self.games / elapsed if elapsed > 0 else 0.0,
+            'mean_duration_s': self.busy / self.games if self.games else 0.0,
+            'p99_duration_s': self.quantile(0.99),
+        }
+
+
+class TournamentMetrics:
+    def __init__(self, path, total_games, interval=5.0, workers=1):
+        self.path = path
+        self.total_games = total_games
+        self.interval = interval
+        self.workers = workers
+        self.started = time.monotonic()
+        self.overall = _Series()
+        self.pairs = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = threading.Thread(target=self._tick, daemon=True)
+        self._timer.start()
+
+    def _tick(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def add(self, pair, durations):
+        """Record one batch of finished games for `pair` (X level, O level)."""
+        with self._lock:
+            series = self.pairs.get(pair)
+            if series is None:
+                series = self.pairs[pair] = _Series()
+            now = time.monotonic()
+            series.add(durations, now)
+            self.overall.add(durations, now)
+
+    def snapshot(self, done=False):
+        with self._lock:
+            return self._snapshot(done)
+
+    def _snapshot(self, done):
+        elapsed = time.monotonic() - self.started
+        overall = self.overall.summary(elapsed)
+        remaining = self.total_games - self.overall.games
+        rate = overall['games_per_s']
+        overall.update({
+            'total_games': self.total_games,
+            'elapsed_s': elapsed,
+            'eta_s': remaining / rate if rate > 0 else None,
+            'worker_utilization': self.overall.busy / (elapsed * self.workers) if elapsed > 0 else 0.0,
+            'done': done,
+            'updated_unix': time.time(),
+        })
+        # A pairing's rate is its games over the wall time from its first
+        # game starting to its latest batch finishing
+        pairs = {f'{a}vs{b}': s.summary(s.wall()) for (a, b), s in sorted(self.pairs.items())}
+        return {'overall': overall, 'pairs': pairs}
+
+    def write(self, done=False):
+        snap = self.snapshot(done)
+        if self.path.endswith('.prom'):
+            text = _prometheus(snap)
+        else:
+            text = json.dumps(snap, indent=2) + '\n'
+        tmp = f'{self.path}.tmp{os.getpid()}.{threading.get_ident()}'
+        with open(tmp, 'w') as f:
+            f.write(text)
+        os.replace(tmp, self.path)
+
+    def close(self, done=True):
+        """Stop the timer and write the final numbers."""
+        self._stop.set()
+        self._timer.join()
+        self.write(done=done)
+
+
+def _prometheus(snap):
+    o = snap['overall']
+    lines = [
+        '# TYPE tourney_games_total counter',
+        f"tourney_games_total {o['games']:d}",
+        '# TYPE tourney_games_planned gauge',
+        f"tourney_games_planned {o['total_games']:d}",
+        '# TYPE tourney_games_per_second gauge',
+        f"tourney_games_per_second {o['games_per_s']:.6g}",
+        '# TYPE tourney_game_duration_mean_seconds gauge',
+        f"tourney_game_duration_mean_seconds {o['mean_duration_s']:.6g}",
+        '# TYPE tourney_game_duration_p99_seconds gauge',
+        f"tourney_game_duration_p99_seconds {o['p99_duration_s']:.6g}",
+        '# TYPE tourney_eta_seconds gauge',
+        f"tourney_eta_seconds {o['eta_s'] if o['eta_s'] is not None else 'NaN'}",
+        '# TYPE tourney_worker_utilization gauge',
+        f"tourney_worker_utilization {o['worker_utilization']:.6g}",
+        '# TYPE tourney_done gauge',
+        f"tourney_done {int(o['done'])}",
+        '# TYPE tourney_updated_timestamp_seconds gauge',
+        f"tourney_updated_timestamp_seconds {o['updated_unix']:.3f}",
+    ]
+    lines.append('# TYPE tourney_pair_games_total counter')
+    for pair, s in snap['pairs'].items():
+        lines.append(f'tourney_pair_games_total{{pair="{pair}"}} {s["games"]:d}')
+    for name, key in (('pair_games_per_second', 'games_per_s'),
+                      ('pair_game_duration_mean_seconds', 'mean_duration_s'),
+                      ('pair_game_duration_p99_seconds', 'p99_duration_s')):
+        lines.append(f'# TYPE tourney_{name} gauge')
+        for pair, s in snap['pairs'].items():
+            lines.append(f'tourney_{name}{{pair="{pair}"}} {s[key]:.6g}')
+    return '\n'.join(lines) + '\n'
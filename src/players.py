@@ -0,0 +1,207 @@
+"""Player registry: every AI level as an object with per-game sessions.
+
+A player is told which side it plays by new_game(side), is asked for moves
+with get_move(board, player), sees the opponent's replies through
+observe(move) and is released with close(). Because a player is an object,
+it can carry state from one move to the next (the ultimate MCTS player
+keeps its search tree between moves) and its own RNG: pass `seed` for a
+reproducible player, or leave it None to seed it from the OS. Players can
+be pickled, so they can be sent to worker processes.
+
+Players are only built when asked for, and a level's module is imported
+the first time one of its players needs it, so e.g. numpy and the Level 4
+weights are not loaded unless Level 4 plays.
+
+    player = make_player(3)                 # classic Level 3
+    player = make_player(2, 'ultimate', seed=7)
+
+get_moves(boards, players) is the batch form used by lockstep tournaments.
+It shares one player between many games, so it only suits players that
+keep no per-game state (all classic levels).
+"""
+import importlib
+import random
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from tictactoe_engine import board_key
+
+_modules = {}
+
+
+def _load(name):
+    # Imported on first use; kept out of the player so it stays picklable
+    if name not in _modules:
+        _modules[name] = importlib.import_module(name)
+    return _modules[name]
+
+
+class Player:
+    module = None
+    stateful = False
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.side = None
+
+    @property
+    def ai(self):
+        return _load(self.module)
+
+    def new_game(self, side):
+        self.side = side
+
+    def get_move(self, board, player):
+        return self.ai.get_move(board, player)
+
+    def get_moves(self, boards, players):
+        return [self.get_move(board, player) for board, player in zip(boards, players)]
+
+    def observe(self, move):
+        pass
+
+    def close(self):
+        pass
+
+
+class RandomPlayer(Player):
+    """Level 1: a uniformly random legal move."""
+    module = 'Level1.ai_player'
+
+    def get_move(self, board, player):
+        return self.ai.get_move(board, player, rng=self.rng)
+
+    def get_moves(self, boards, players):
+        return self.ai.get_moves(boards, players, rng=self.rng)
+
+
+class HeuristicPlayer(Player):
+    """Level 2: win, block, center, corners, then random."""
+    module = 'Level2.start'
+
+    def get_move(self, board, player):
+        return self.ai.get_move(board, player, rng=self.rng)
+
+    def get_moves(self, boards, players):
+        return self.ai.get_moves(boards, players, rng=self.rng)
+
+
+class MinimaxPlayer(Player):
+    """Level 3: alpha-beta minimax. Positions it has solved are remembered
+    for the player's lifetime, across games. `book` names a directory of
+    positions solved by pn_search; its moves are played when it knows one.
+    With `depth` set it searches only that many plies and scores the leaves
+    with evaluator.LineEvaluator (`weights` overrides its defaults). `algo`
+    picks a search from Level3/search.py ('alphabeta', 'pvs', 'aspiration',
+    'mtdf'); its transposition table is kept for the player's lifetime.
+    `workers` > 1 splits the full search's root moves over that many
+    processes (get_move_parallel); close() shuts the pool down."""
+    module = 'Level3.ai_level3'
+
+    def __init__(self, seed=None, book=None, depth=None, weights=None, algo=None, workers=None):
+        super().__init__(seed)
+        self.solved = {}
+        self.book_path = book
+        self._book = None
+        self.depth = depth
+        self.weights = weights
+        self.algo = algo
+        self.workers = workers
+        self._searcher = None
+
+    def _search(self, board, player):
+        if self.depth is None and self.algo is None:
+            if self.workers and self.workers > 1:
+                return self.ai.get_move_parallel(board, player, self.workers)
+            return self.ai.get_move(board, player)
+        if self._searcher is None:
+            self._searcher = _load('Level3.search').Searcher(self.algo or 'alphabeta', self.depth, self.weights)
+        return self._searcher.search(board, player)['move']
+
+    def get_move(self, board, player):
+        key = (board_key(board), player)
+        if key not in self.solved:
+            move = None
+            if self.book_path:
+                if self._book is None:
+                    self._book = _load('pn_search').Book(self.book_path)
+                move = self._book.move(board, player)
+            self.solved[key] = move or self._search(board, player)
+        return self.solved[key]
+
+    def close(self):
+        if self.workers and self.workers > 1:
+            self.ai.shutdown_pool()
+
+
+class LearnedPlayer(Player):
+    """Level 4: self-play trained value table."""
+    module = 'Level4.ai_rl'
+
+
+class UltimateRandomPlayer(Player):
+    module = 'ultimate.ai'
+
+    def get_move(self, state, player):
+        return self.ai.random_get_move(state, player, rng=self.rng)
+
+
+class UltimateMCTSPlayer(Player):
+    """MCTS that keeps its tree between moves: after its own move and the
+    opponent's observed reply, the matching subtree becomes the new root."""
+    module = 'ultimate.ai'
+    stateful = True
+
+    def __init__(self, seed=None, budget_s=None, iterations=None):
+        super().__init__(seed)
+        self.budget_s = budget_s
+        self.iterations = iterations
+        self._root = None
+        self._state = None      # position the root belongs to
+
+    def new_game(self, side):
+        super().new_game(side)
+        self._root = None
+        self._state = None
+
+    def _same(self, state):
+        s = self._state
+        return s is not None and (s.x, s.o, s.forced, s.player) == \
+            (state.x, state.o, state.forced, state.player)
+
+    def get_move(self, state, player):
+        ai = self.ai
+        if not ai.legal_moves(state):
+            return None
+        if self._root is None or not self._same(state):
+            self._root = ai.new_root(state)
+        budget_s = ai.BUDGET_S if self.budget_s is None else self.budget_s
+        move = ai.search(state, self._root, budget_s, self.iterations, self.rng)
+        self._state = state.copy()
+        self.observe(move)
+        return move
+
+    def observe(self, move):
+        if self._root is None:
+            return
+        ai = self.ai
+        if move not in ai.legal_moves(self._state):
+            self._root = None
+            return
+        ai.play_in_place(self._state, move)
+        self._root = ai.advance(self._root, move)
+
+
+PLAYERS = {
+    'classic': {1: RandomPlayer, 2: HeuristicPlayer, 3: MinimaxPlayer, 4: LearnedPlayer},
+    'ultimate': {1: UltimateRandomPlayer, 2: UltimateMCTSPlayer},
+}
+
+
+def levels(game='classic'):
+    return sorted(PLAYERS[game])
+
+
+def make_player(level, game='classic', seed=None, **options):
+    """Build a new player for `level` of `game` ('classic' or 'ultimate')."""
+    return PLAYERS[game][level](seed=seed, **options)
@@ -0,0 +1,192 @@
+"""Plot pipeline for tournament results.
+
+The CSV is reduced once to a small aggregate (per-pairing results and
+game-length histograms, per-level win counts) that every figure is drawn
+from. Each figure is rendered on the Agg backend with its own Figure object
+(no pyplot state), in a separate process when several need drawing.
+
+Every output file is recorded in a manifest (.plot_manifest.json in its
+directory) under a hash of the aggregate data the figure reads, its
+parameters and this module's source. A figure whose hash is unchanged and
+whose file still exists is skipped.
+"""
+import csv
+import hashlib
+import json
+import os
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+MANIFEST = '.plot_manifest.json'
+
+with open(os.path.abspath(__file__), 'rb') as _f:
+    SOURCE_HASH = hashlib.sha256(_f.read()).hexdigest()
+
+
+def load_results(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def aggregate(rows):
+    """Reduce result rows to plain (JSON-serializable) data for the figures."""
+    pairs = defaultdict(lambda: {'X': 0, 'O': 0, 'Tie': 0, 'moves': defaultdict(int)})
+    games = defaultdict(int)
+    wins = defaultdict(int)
+    ties = 0
+    for r in rows:
+        a_x, a_o = int(r['ai_X_level']), int(r['ai_O_level'])
+        winner = r['winner']
+        stats = pairs[(a_x, a_o)]
+        stats[winner] += 1
+        stats['moves'][int(r.get('moves', 0))] += 1
+        games[a_x] += 1
+        games[a_o] += 1
+        if winner == 'Tie':
+            ties += 1
+        elif winner == 'X':
+            wins[a_x] += 1
+        elif winner == 'O':
+            wins[a_o] += 1
+    return {
+        'pairs': [[a_x, a_o, s['X'], s['O'], s['Tie'], sorted(s['moves'].items())]
+                  for (a_x, a_o), s in sorted(pairs.items())],
+        'levels': [[lv, games[lv], wins[lv]] for lv in sorted(games)],
+        'ties': ties,
+    }
+
+
+def _figure(figsize):
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+
+def render_stacked(agg, path, figsize=(10, 5)):
+    fig = _figure(figsize)
+    ax = fig.subplots()
+    labels, x_win, o_win, ties = [], [], [], []
+    for a_x, a_o, x, o, tie, _ in agg['pairs']:
+        total = x + o + tie
+        labels.append(f'{a_x}vs{a_o}')
+        x_win.append(x / total * 100)
+        o_win.append(o / total * 100)
+        ties.append(tie / total * 100)
+    ind = list(range(len(labels)))
+    ax.bar(ind, x_win, label='X wins', color='#4c72b0')
+    ax.bar(ind, o_win, bottom=x_win, label='O wins', color='#dd8452')
+    ax.bar(ind, ties, bottom=[x + o for x, o in zip(x_win, o_win)], label='Ties', color='#55a868')
+    ax.set_ylabel('Percentage (%)')
+    ax.set_title('Results by Pairing (X-level vs O-level)')
+    ax.set_xticks(ind)
+    ax.set_xticklabels(labels, rotation=45)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def render_moves_box(agg, path, figsize=(10, 5)):
+    fig = _figure(figsize)
+    ax = fig.subplots()
+    groups, labels = [], []
+    for a_x, a_o, _, _, _, hist in agg['pairs']:
+        groups.append([m for m, n in hist for _ in range(n)])
+        labels.append(f'{a_x}vs{a_o}')
+    if groups:
+        ax.boxplot(groups, tick_labels=labels, showmeans=True)
+    ax.set_ylabel('Moves per game')
+    ax.set_title('Distribution of Game Lengths by Pairing')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def render_win_rate(agg, path, figsize=(8, 5)):
+    fig = _figure(figsize)
+    ax = fig.subplots()
+    levels = [lv for lv, _, _ in agg['levels']]
+    rates = [w / total * 100 if total else 0.0 for _, total, w in agg['levels']]
+    bars = ax.bar([str(lv) for lv in levels], rates, color=['#2b8cbe', '#7bccc4', '#edf8b1'])
+    ax.set_ylim(0, 100)
+    ax.set_xlabel('AI Level')
+    ax.set_ylabel('Win rate (%)')
+    ax.set_title('AI Win Rate by Level (ties ignored)')
+    for bar, rate in zip(bars, rates):
+        ax.text(bar.get_x() + bar.get_width() / 2, rate + 1, f'{rate:.1f}%', ha='center')
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+# name -> (renderer, aggregate sections it reads)
+FIGURES = {
+    'stacked': (render_stacked, ('pairs',)),
+    'moves_box': (render_moves_box, ('pairs',)),
+    'win_rate': (render_win_rate, ('levels',)),
+}
+
+
+def figure_hash(agg, name, params):
+    _, sections = FIGURES[name]
+    content = {'figure': name, 'params': params, 'source': SOURCE_HASH,
+               'data': {s: agg[s] for s in sections}}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def _render(name, agg, path, params):
+    FIGURES[name][0](agg, path, **params)
+    return path
+
+
+def _load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path, manifest):
+    # A temp file of our own, so concurrent plot runs cannot clobber it
+    with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path), prefix=MANIFEST,
+                                     suffix='.tmp', delete=False) as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(f.name, path)
+
+
+def render_figures(agg, jobs, workers=None):
+    """Render `jobs`, a list of (figure name, output path, params dict).
+
+    Returns {path: 'rendered' | 'unchanged'}.
+    """
+    manifests = {}
+    todo = []
+    status = {}
+    for name, path, params in jobs:
+        directory = os.path.dirname(os.path.abspath(path))
+        manifest = manifests.setdefault(directory, _load_manifest(os.path.join(directory, MANIFEST)))
+        digest = figure_hash(agg, name, params)
+        key = os.path.basename(path)
+        if manifest.get(key) == digest and os.path.exists(path):
+            status[path] = 'unchanged'
+        else:
+            todo.append((name, path, params, directory, key, digest))
+
+    workers = min(workers or os.cpu_count() or 1, len(todo))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render, name, agg, path, params)
+                       for name, path, params, _, _, _ in todo]
+            for f in futures:
+                f.result()
+    else:
+        for name, path, params, _, _, _ in todo:
+            _render(name, agg, path, params)
+
+    for name, path, params, directory, key, digest in todo:
+        manifests[directory][key] = digest
+        status[path] = 'rendered'
+    for directory in {t[3] for t in todo}:
+        _save_manifest(os.path.join(directory, MANIFEST), manifests[directory])
+    return status
@@ -0,0 +1,228 @@
+"""Depth-first proof-number search (df-pn) for m,n,k games.
+
+Proves or disproves "`attacker` can force a win" from a position. A game
+value needs two such questions: the side to move wins if its attack is
+proven, loses if the opponent's is, and the game is a draw if both are
+disproven.
+
+Positions are tuples of cells (0 empty, 1 X, 2 O) in row-major order, as
+in positions.py; the side to move is passed explicitly so either side may
+have started. Proof and disproof numbers live in a transposition table
+keyed by the position's symmetry-canonical form. When the table outgrows
+`tt_size`, the entries whose subtrees took the least work to search are
+dropped (they are the cheapest to redo) until it is back to `gc_ratio`
+of the limit.
+
+Solved entries can be dumped to a directory of .npy arrays (see dump())
+and read back as a Book of known results, e.g. for Level 3:
+make_player(3, book='solved/').
+"""
+import json
+import os
+import sys
+import time
+from operator import itemgetter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from tictactoe_engine import lines_through, X, O, EMPTY
+from positions import symmetries, canonical, _winner_after
+
+INF = 10 ** 9
+CODES = {EMPTY: 0, X: 1, O: 2}
+
+
+class _OutOfNodes(Exception):
+    pass
+
+
+def from_board(board):
+    """List board -> (pos tuple, rows, cols)."""
+    return tuple(CODES[v] for row in board for v in row), len(board), len(board[0])
+
+
+class DFPNSolver:
+    def __init__(self, rows, cols, k, tt_size=2000000, gc_ratio=0.5, symmetry=True, max_nodes=None):
+        self.rows, self.cols, self.k = rows, cols, k
+        self.cells = rows * cols
+        self.through = lines_through(rows, cols, k)
+        self.maps = symmetries(rows, cols) if symmetry else None
+        # Symmetry maps as C-level getters; canonical() is the hot spot otherwise
+        self._perms = [itemgetter(*m) for m in self.maps] if symmetry else None
+        self.tt_size = tt_size
+        self.gc_ratio = gc_ratio
+        self.max_nodes = max_nodes
+        self.tt = {}          # (pos, to_move, attacker) -> [pn, dn, work]
+        self.nodes = 0
+        self.gc_runs = 0
+        self.seconds = 0.0
+
+    def _key(self, pos, to_move, attacker):
+        if self._perms:
+            pos = min([p(pos) for p in self._perms])
+        return pos, to_move, attacker
+
+    def prove(self, pos, to_move, attacker):
+        """Return True (proven), False (disproven) or None (node budget spent)."""
+        t0 = time.perf_counter()
+        try:
+            key = self._key(pos, to_move, attacker)
+            entry = self.tt.get(key)
+            if entry is None or (entry[0] and entry[1]):
+                self._mid(pos, to_move, attacker, key, INF, INF)
+            pn, dn, _ = self.tt[key]
+            return True if pn == 0 else False if dn == 0 else None
+        except _OutOfNodes:
+            return None
+        finally:
+            self.seconds += time.perf_counter() - t0
+
+    def solve(self, pos, to_move):
+        """Value for the side to move: 1 win, 0 draw, -1 loss, None unknown."""
+        if 0 not in pos or any(c and _winner_after(pos, i, self.through) for i, c in enumerate(pos)):
+            raise ValueError('position is already over')
+        win = self.prove(pos, to_move, to_move)
+        if win:
+            return 1
+        loss = self.prove(pos, to_move, 3 - to_move)
+        if loss:
+            return -1
+        if win is False and loss is False:
+            return 0
+        return None
+
+    def _children(self, pos, to_move, attacker):
+        # [key, child pos, terminal (pn, dn) or None] for every legal move
+        children = []
+        for i in range(self.cells):
+            if pos[i]:
+                continue
+            child = pos[:i] + (to_move,) + pos[i + 1:]
+            if _winner_after(child, i, self.through):
+                terminal = (0, INF) if to_move == attacker else (INF, 0)
+            elif 0 not in child:
+                terminal = (INF, 0)
+            else:
+                terminal = None
+            children.append((self._key(child, 3 - to_move, attacker), child, terminal))
+        return children
+
+    def _mid(self, pos, to_move, attacker, key, th_phi, th_delta):
+        # Search `pos` until its phi/delta reach the thresholds. phi is the
+        # proof number at OR nodes (attacker to move) and the disproof number
+        # at AND nodes; delta is the other one.
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise _OutOfNodes
+        if len(self.tt) > self.tt_size:
+            self._gc()
+        start = self.nodes
+        or_node = to_move == attacker
+        child_or = not or_node
+        children = self._children(pos, to_move, attacker)
+        tt = self.tt
+        while True:
+            phi, delta = INF, 0
+            best = None
+            delta_1 = delta_2 = INF
+            for child_key, child, terminal in children:
+                pn, dn = terminal or tt.get(child_key, (1, 1))[:2]
+                c_phi, c_delta = (pn, dn) if child_or else (dn, pn)
+                delta = min(INF, delta + c_phi)
+                if c_delta < delta_1:
+                    delta_2, delta_1 = delta_1, c_delta
+                    best = (child_key, child, c_phi)
+                elif c_delta < delta_2:
+                    delta_2 = c_delta
+            phi = delta_1
+            entry = tt.get(key)
+            work = (entry[2] if entry else 0) + self.nodes - start
+            tt[key] = [phi, delta, work] if or_node else [delta, phi, work]
+            start = self.nodes
+            if phi >= th_phi or delta >= th_delta:
+                return
+            child_key, child, c_phi = best
+            self._mid(child, 3 - to_move, attacker, child_key,
+                      min(INF, th_delta - delta + c_phi), min(th_phi, delta_2 + 1))
+
+    def _gc(self):
+        # Keep the entries that cost the most to compute. Prune in place:
+        # frames further up the search hold references to this dict.
+        self.gc_runs += 1
+        keep = int(self.tt_size * self.gc_ratio)
+        ranked = sorted(self.tt, key=lambda key: self.tt[key][2], reverse=True)
+        for key in ranked[keep:]:
+            del self.tt[key]
+
+    def solved(self):
+        """{(pos, to_move): value for the side to move} for every position
+        whose value the table proves."""
+        values = {}
+        no_win = set()
+        for (pos, to_move, attacker), (pn, dn, _) in self.tt.items():
+            if pn == 0:
+                values[(pos, to_move)] = 1 if attacker == to_move else -1
+            elif dn == 0:
+                no_win.add((pos, to_move, attacker))
+        for pos, to_move, attacker in no_win:
+            if attacker == to_move and (pos, to_move, 3 - to_move) in no_win:
+                values.setdefault((pos, to_move), 0)
+        return values
+
+    def dump(self, out_dir):
+        """Write solved positions as boards/to_move/value .npy files plus
+        meta.json; returns how many were written."""
+        import numpy as np
+        values = self.solved()
+        items = sorted(values.items())
+        os.makedirs(out_dir, exist_ok=True)
+        boards = np.array([pos for (pos, _), _ in items], dtype=np.int8).reshape(len(items), self.cells)
+        np.save(os.path.join(out_dir, 'boards.npy'), boards)
+        np.save(os.path.join(out_dir, 'to_move.npy'), np.array([t for (_, t), _ in items], dtype=np.int8))
+        np.save(os.path.join(out_dir, 'value.npy'), np.array([v for _, v in items], dtype=np.int8))
+        with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+            json.dump({'rows': self.rows, 'cols': self.cols, 'k': self.k, 'positions': len(items),
+                       'canonical': self.maps is not None, 'solver': 'df-pn'}, f, indent=2)
+        return len(items)
+
+
+class Book:
+    """Solved positions loaded from a dump() directory."""
+
+    def __init__(self, path):
+        import numpy as np
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        boards = np.load(os.path.join(path, 'boards.npy'))
+        to_move = np.load(os.path.join(path, 'to_move.npy'))
+        value = np.load(os.path.join(path, 'value.npy'))
+        self.maps = symmetries(self.meta['rows'], self.meta['cols']) if self.meta['canonical'] else None
+        self.through = lines_through(self.meta['rows'], self.meta['cols'], self.meta['k'])
+        self.values = {(tuple(b), t): v for b, t, v in
+                       zip(boards.tolist(), to_move.tolist(), value.tolist())}
+
+    def value(self, pos, to_move):
+        key = canonical(pos, self.maps) if self.maps else pos
+        return self.values.get((key, to_move))
+
+    def move(self, board, player, k=None):
+        """Best move known from the book, or None if no child is in it or
+        the book is for another game. k defaults to the engine's,
+        min(rows, cols)."""
+        pos, rows, cols = from_board(board)
+        k = k or min(rows, cols)
+        if (rows, cols, k) != (self.meta['rows'], self.meta['cols'], self.meta['k']):
+            return None
+        mark = CODES[player]
+        best, best_value = None, -2
+        for i in range(len(pos)):
+            if pos[i]:
+                continue
+            child = pos[:i] + (mark,) + pos[i + 1:]
+            if _winner_after(child, i, self.through):
+                return divmod(i, cols)
+            v = self.value(child, 3 - mark) if 0 in child else 0
+            if v is not None and -v > best_value:
+                best, best_value = divmod(i, cols), -v
+        # Unknown children might be better unless the best one is provably optimal
+        if best_value == 1 or best_value == self.value(pos, mark):
+            return best
+        return None
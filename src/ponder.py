@@ -0,0 +1,113 @@
+"""Pondering: search the AI's replies while the human is thinking.
+
+While it is the human's turn, a background thread walks the human's legal
+moves (most likely first) and asks the AI for its reply to each resulting
+position. When the human commits a move, `take` hands back the precomputed
+reply instantly if it is ready, otherwise the caller searches as usual.
+"""
+import sys
+import os
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from tictactoe_engine import (
+    available_moves,
+    apply_move,
+    board_key,
+    check_winner,
+    is_terminal,
+    get_next_player,
+)
+
+
+def order_replies(board, player):
+    # Same priorities a sensible opponent uses: win, block, center, corners, rest
+    moves = available_moves(board)
+    if not moves:
+        return []
+    last = len(board) - 1
+    center = (last // 2, last // 2)
+    corners = {(0, 0), (0, last), (last, 0), (last, last)}
+    opponent = get_next_player(player)
+
+    def rank(m):
+        if check_winner(apply_move(board, m, player)) == player:
+            return 0
+        if check_winner(apply_move(board, m, opponent)) == opponent:
+            return 1
+        if m == center:
+            return 2
+        if m in corners:
+            return 3
+        return 4
+
+    return sorted(moves, key=rank)
+
+
+class Ponderer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._position = None
+        self._session = None
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, board, human, get_move):
+        """Begin pondering `board` with `human` to move; no-op if already on it."""
+        position = (board_key(board), human, get_move)
+        if position == self._position:
+            return
+        self.stop()
+        self._position = position
+        self._session = {'stop': threading.Event(), 'replies': {}}
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(board_key(board), human, get_move, self._session),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, key, human, get_move, session):
+        board = [list(row) for row in key]
+        ai = get_next_player(human)
+        for move in order_replies(board, human):
+            if session['stop'].is_set():
+                return
+            child = apply_move(board, move, human)
+            if is_terminal(child):
+                continue
+            reply = get_move(child, ai)
+            with self._lock:
+                session['replies'][board_key(child)] = reply
+
+    def take(self, board):
+        """Return the pondered reply for `board` (human just moved) or None.
+
+        Pondering stops either way. A search already under way is finished
+        first, so a reply for exactly this position is never wasted.
+        """
+        session = self._session
+        self.stop()
+        if session is None:
+            self.misses += 1
+            return None
+        key = board_key(board)
+        with self._lock:
+            found = key in session['replies']
+            move = session['replies'].get(key)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return move
+
+    def stop(self):
+        """Stop pondering. Waits for a get_move in progress: the caller is
+        about to use the same player (and its search cache) itself."""
+        if self._session is not None:
+            self._session['stop'].set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+        self._position = None
+        self._session = None
@@ -0,0 +1,223 @@
+"""Enumerate and solve reachable positions, and export them as flat arrays.
+
+Positions are tuples of cells (0 empty, 1 X, 2 O) in row-major order, with
+X moving first. Each is solved by memoized negamax from the side to move's
+point of view (1 win, 0 draw, -1 loss). Output is one .npy file per field,
+loadable with np.load(path, mmap_mode='r'):
+
+  boards.npy     int8   (N, rows*cols)  cell contents
+  to_move.npy    int8   (N,)            1 X, 2 O
+  value.npy      int8   (N,)            result for the side to move
+  exact.npy      bool   (N,)            False if the search horizon cut it short
+  best_mask.npy  uint64 (N,)            bit i set if cell i is an optimal move
+  sym_class.npy  int32  (N,)            index of the position's symmetry class
+  meta.json                             board shape and counts
+"""
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from tictactoe_engine import winning_lines, lines_through
+
+
+def symmetries(rows, cols):
+    """Cell permutations mapping the board onto itself (as index tuples)."""
+    def perm(f):
+        return tuple(f(r, c) for r in range(rows) for c in range(cols))
+
+    maps = [
+        perm(lambda r, c: r * cols + c),
+        perm(lambda r, c: r * cols + (cols - 1 - c)),
+        perm(lambda r, c: (rows - 1 - r) * cols + c),
+        perm(lambda r, c: (rows - 1 - r) * cols + (cols - 1 - c)),
+    ]
+    if rows == cols:
+        n = rows
+        maps += [
+            perm(lambda r, c: c * n + r),
+            perm(lambda r, c: c * n + (n - 1 - r)),
+            perm(lambda r, c: (n - 1 - c) * n + r),
+            perm(lambda r, c: (n - 1 - c) * n + (n - 1 - r)),
+        ]
+    return maps
+
+
+def canonical(pos, maps):
+    return min(tuple(pos[i] for i in m) for m in maps)
+
+
+def _winner_after(pos, cell, through):
+    mark = pos[cell]
+    for line in through[cell]:
+        if all(pos[i] == mark for i in line):
+            return mark
+    return 0
+
+
+def enumerate_positions(rows, cols, k, max_depth=None, dedupe=False):
+    """Breadth-first list of positions reachable from the empty board.
+
+    Terminal positions are included but not expanded. With `dedupe`, only
+    one representative (the canonical form) of each symmetry class is kept.
+    """
+    through = lines_through(rows, cols, k)
+    maps = symmetries(rows, cols)
+    cells = rows * cols
+    start = (0,) * cells
+    layer = [start]
+    seen = {start}
+    out = [start]
+    depth = 0
+    while layer and (max_depth is None or depth < max_depth):
+        mark = 1 if depth % 2 == 0 else 2
+        nxt = []
+        for pos in layer:
+            if _is_terminal(pos, through):
+                continue
+            for i in range(cells):
+                if pos[i]:
+                    continue
+                child = pos[:i] + (mark,) + pos[i + 1:]
+                if dedupe:
+                    child = canonical(child, maps)
+                if child not in seen:
+                    seen.add(child)
+                    nxt.append(child)
+        out.extend(nxt)
+        layer = nxt
+        depth += 1
+    return out
+
+
+def _is_terminal(pos, through):
+    if 0 not in pos:
+        return True
+    for cell, mark in enumerate(pos):
+        if mark and _winner_after(pos, cell, through):
+            return True
+    return False
+
+
+class Solver:
+    """Memoized negamax over one board shape; `horizon` limits search depth."""
+
+    def __init__(self, rows, cols, k, horizon=None):
+        self.cells = rows * cols
+        self.lines = winning_lines(rows, cols, k)
+        self.through = lines_through(rows, cols, k)
+        self.horizon = horizon
+        self.memo = {}
+
+    def winner(self, pos):
+        for line in self.lines:
+            mark = pos[line[0]]
+            if mark and all(pos[i] == mark for i in line):
+                return mark
+        return 0
+
+    def solve(self, pos):
+        """Return (value, best_mask, exact) for the side to move at `pos`."""
+        if self.winner(pos):
+            return -1, 0, True
+        if 0 not in pos:
+            return 0, 0, True
+        mark = 1 if pos.count(1) == pos.count(2) else 2
+        best, mask, exact = -2, 0, True
+        for i in range(self.cells):
+            if pos[i]:
+                continue
+            child = pos[:i] + (mark,) + pos[i + 1:]
+            if _winner_after(child, i, self.through):
+                v, e = 1, True
+            else:
+                v, e = self._negamax(child, self.horizon)
+                v = -v
+            exact = exact and e
+            if v > best:
+                best, mask = v, 1 << i
+            elif v == best:
+                mask |= 1 << i
+        return best, mask, exact
+
+    def _negamax(self, pos, depth):
+        # Value for the side to move at `pos` (no winner yet)
+        if 0 not in pos:
+            return 0, True
+        if depth is not None and depth <= 0:
+            return 0, False
+        key = pos if depth is None else (pos, depth)
+        hit = self.memo.get(key)
+        if hit is not None:
+            return hit
+        mark = 1 if pos.count(1) == pos.count(2) else 2
+        sub = None if depth is None else depth - 1
+        best, exact = -2, True
+        for i in range(self.cells):
+            if pos[i]:
+                continue
+            child = pos[:i] + (mark,) + pos[i + 1:]
+            if _winner_after(child, i, self.through):
+                best, exact = 1, True
+                break
+            v, e = self._negamax(child, sub)
+            exact = exact and e
+            if -v > best:
+                best = -v
+        self.memo[key] = (best, exact)
+        return best, exact
+
+
+_solver = None
+
+
+def _init_solver(rows, cols, k, horizon):
+    global _solver
+    _solver = Solver(rows, cols, k, horizon)
+
+
+def _solve_chunk(chunk):
+    return [_solver.solve(pos) for pos in chunk]
+
+
+def solve_positions(positions, rows, cols, k, horizon=None, workers=1):
+    if workers <= 1:
+        _init_solver(rows, cols, k, horizon)
+        return _solve_chunk(positions)
+    size = max(1, len(positions) // (workers * 8))
+    chunks = [positions[i:i + size] for i in range(0, len(positions), size)]
+    with Pool(workers, initializer=_init_solver, initargs=(rows, cols, k, horizon)) as pool:
+        return [r for part in pool.map(_solve_chunk, chunks) for r in part]
+
+
+def export_positions(out_dir, rows=3, cols=3, k=3, max_depth=None, horizon=None,
+                     dedupe=False, workers=1):
+    """Enumerate, solve and write the arrays; returns the number of positions."""
+    if rows * cols > 64:
+        raise ValueError('best_mask holds at most 64 cells')
+    positions = enumerate_positions(rows, cols, k, max_depth, dedupe)
+    solved = solve_positions(positions, rows, cols, k, horizon, workers)
+
+    maps = symmetries(rows, cols)
+    classes = {}
+    sym_class = [classes.setdefault(canonical(pos, maps), len(classes)) for pos in positions]
+
+    os.makedirs(out_dir, exist_ok=True)
+    arrays = {
+        'boards': np.array(positions, dtype=np.int8).reshape(len(positions), rows * cols),
+        'to_move': np.array([1 if p.count(1) == p.count(2) else 2 for p in positions], dtype=np.int8),
+        'value': np.array([v for v, _, _ in solved], dtype=np.int8),
+        'exact': np.array([e for _, _, e in solved], dtype=bool),
+        'best_mask': np.array([m for _, m, _ in solved], dtype=np.uint64),
+        'sym_class': np.array(sym_class, dtype=np.int32),
+    }
+    for name, arr in arrays.items():
+        np.save(os.path.join(out_dir, f'{name}.npy'), arr)
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump({'rows': rows, 'cols': cols, 'k': k, 'positions': len(positions),
+                   'symmetry_classes': len(classes), 'deduplicated': dedupe,
+                   'max_depth': max_depth, 'horizon': horizon}, f, indent=2)
+    return len(positions)
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 """Run AI-vs-AI tournaments and log results to CSV.
 
-Usage examples:
-  python run_tournament.py --games 500 --out results.csv
-  python run_tournament.py --games 200 --pairs "1,3;2,3" --out results.csv
+Usage examples (from the repository root):
+  python -m src.run_tournament --games 500 --out results.csv
+  python -m src.run_tournament --games 200 --pairs "1,3;2,3" --seed 1 --out results.csv
 """
 import csv
 import time
@@ -11,20 +11,13 @@ import argparse
 from collections import defaultdict
 
 from src.tictactoe_engine import new_board, make_move_in_place, check_winner, is_tie, get_next_player, X, O
-
-# Import AI modules
-import Level1.ai_player as ai1
-import Level2.start as ai2
-import Level3.ai_level3 as ai3
-
-AI_MODULES = {
-    1: ai1,
-    2: ai2,
-    3: ai3,
-}
+from src.players import make_player, levels
 
 
 def play_game(ai_X_module, ai_O_module, starting_player=X):
+    for side, ai in ((X, ai_X_module), (O, ai_O_module)):
+        if ai:
+            ai.new_game(side)
     board = new_board()
     current = starting_player
     moves = 0
@@ -44,6 +37,9 @@ def play_game(ai_X_module, ai_O_module, starting_player=X):
             # Illegal move from AI; treat as loss for that AI
             winner = get_next_player(current)
             return winner, moves
+        other = ai_O_module if current == X else ai_X_module
+        if other:
+            other.observe(move)
 
         w = check_winner(board)
         if w is not None:
@@ -54,9 +50,12 @@ def play_game(ai_X_module, ai_O_module, starting_player=X):
         current = get_next_player(current)
 
 
-def run_pair(ai_level_X, ai_level_O, games, out_writer, start_player=X):
-    mod_X = AI_MODULES[ai_level_X]
-    mod_O = AI_MODULES[ai_level_O]
+def run_pair(ai_level_X, ai_level_O, games, out_writer, start_player=X, seed=None):
+    seeds = (None, None)
+    if seed is not None:
+        seeds = tuple(f'{seed}/{ai_level_X}-{ai_level_O}/{start_player}/{side}' for side in (X, O))
+    mod_X = make_player(ai_level_X, seed=seeds[0])
+    mod_O = make_player(ai_level_O, seed=seeds[1])
 
     for i in range(games):
         t0 = time.time()
@@ -71,6 +70,8 @@ def run_pair(ai_level_X, ai_level_O, games, out_writer, start_player=X):
             'moves': moves,
             'duration_s': f"{duration:.6f}",
         })
+    mod_X.close()
+    mod_O.close()
 
 
 def parse_pairs(s):
@@ -88,15 +89,16 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--games', '-g', type=int, default=200, help='Games per pairing')
     parser.add_argument('--out', '-o', default='tourney_results.csv', help='CSV output file')
-    parser.add_argument('--pairs', '-p', default=None, help='Pairs like "1,2;1,3"; if omitted run all pairs among 1..3')
+    parser.add_argument('--pairs', '-p', default=None, help='Pairs like "1,2;1,3"; if omitted run all pairs among the AI levels')
     parser.add_argument('--start', choices=['X', 'O', 'alternate'], default='alternate')
+    parser.add_argument('--seed', default=None, help='Seed the players\' RNGs for a reproducible run')
     args = parser.parse_args()
 
     if args.pairs:
         pairs = parse_pairs(args.pairs)
     else:
-        levels = sorted(AI_MODULES.keys())
-        pairs = [(a, b) for a in levels for b in levels]
+        all_levels = levels()
+        pairs = [(a, b) for a in all_levels for b in all_levels]
 
     with open(args.out, 'w', newline='') as f:
         fieldnames = ['ai_X_level', 'ai_O_level', 'starting_player', 'winner', 'moves', 'duration_s']
@@ -109,13 +111,13 @@ def main():
                 # run half with X start, half with O start
                 half = args.games // 2
                 print(f'Running {half} games: X(level={a}) start vs O(level={b})')
-                run_pair(a, b, half, writer, start_player=X)
+                run_pair(a, b, half, writer, start_player=X, seed=args.seed)
                 print(f'Running {args.games - half} games: O(level={b}) start vs X(level={a})')
-                run_pair(a, b, args.games - half, writer, start_player=O)
+                run_pair(a, b, args.games - half, writer, start_player=O, seed=args.seed)
             else:
                 sp = X if args.start == 'X' else O
                 print(f'Running {args.games} games: start {args.start} for pairing {a} vs {b}')
-                run_pair(a, b, args.games, writer, start_player=sp)
+                run_pair(a, b, args.games, writer, start_player=sp, seed=args.seed)
 
     print(f'Done. Results saved to {args.out}')
 
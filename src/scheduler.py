@@ -0,0 +1,206 @@
+"""Cost-aware work-stealing scheduler for multi-process tournaments.
+
+Work comes in units: (pair, start_player, games). Units are first dealt
+round-robin onto one deque per worker. Whenever a worker is idle, the
+coordinator cuts its next chunk from the front of that worker's deque,
+sized from the live per-pairing cost estimate (an EWMA of measured game
+durations) so every chunk takes about `target_chunk_s`. Near the end,
+chunks shrink so no worker is left with a long tail. A worker whose deque
+is empty steals from the back of the deque with the most estimated work
+left (half a unit if that is all there is).
+
+With steal=False the same machinery runs plain static sharding: each
+worker gets a contiguous slice of the units and plays them whole.
+"""
+import math
+import multiprocessing as mp
+import pickle
+import queue
+import time
+import traceback
+from collections import deque
+from src.search_cache import flush_loaded
+
+# Games in the first chunk of a pairing, before its cost is known
+PROBE_GAMES = 4
+# How often the coordinator checks that its workers are still alive
+POLL_S = 1.0
+
+
+class CostModel:
+    def __init__(self, smoothing=0.3):
+        self.smoothing = smoothing
+        self.per_game = {}
+
+    def update(self, key, durations):
+        if not durations:
+            return
+        mean = sum(durations) / len(durations)
+        old = self.per_game.get(key)
+        self.per_game[key] = mean if old is None else old + self.smoothing * (mean - old)
+
+    def estimate(self, key):
+        # Unknown pairings are assumed to cost what an average known one does
+        if key in self.per_game:
+            return self.per_game[key]
+        if self.per_game:
+            return sum(self.per_game.values()) / len(self.per_game)
+        return None
+
+
+def _worker(worker_id, tasks, results, run_chunk):
+    # Results are (worker, unit, games played, games, seconds); a failed
+    # chunk is reported as (worker, unit, exception, traceback) instead.
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            unit_id, pair, start_player, n, kwargs = task
+            t0 = time.perf_counter()
+            try:
+                games = run_chunk(pair, start_player, n, **kwargs)
+            except Exception as exc:
+                try:
+                    pickle.dumps(exc)
+                except Exception:
+                    exc = RuntimeError(repr(exc))
+                results.put((worker_id, unit_id, exc, traceback.format_exc()))
+                return
+            results.put((worker_id, unit_id, n, games, time.perf_counter() - t0))
+    finally:
+        flush_loaded()
+
+
+class Scheduler:
+    def __init__(self, units, run_chunk, workers, chunk_kwargs=None, steal=True,
+                 target_chunk_s=0.5, max_chunk=4096):
+        self.units = [list(u) for u in units]      # [pair, start_player, remaining]
+        self.run_chunk = run_chunk
+        self.workers = workers
+        self.chunk_kwargs = chunk_kwargs or {}
+        self.steal = steal
+        self.target_chunk_s = target_chunk_s
+        self.max_chunk = max_chunk
+        self.costs = CostModel()
+        self.busy = [0.0] * workers
+        self.steals = 0
+        self.chunks = 0
+        self.wall_s = 0.0
+
+        self.deques = [deque() for _ in range(workers)]
+        if steal:
+            for i in range(len(self.units)):
+                self.deques[i % workers].append(i)
+        else:
+            per = math.ceil(len(self.units) / workers) if self.units else 0
+            for i in range(len(self.units)):
+                self.deques[i // per].append(i)
+
+    def _work_left(self, unit_ids):
+        total = 0.0
+        for i in unit_ids:
+            pair, _, remaining = self.units[i]
+            total += remaining * (self.costs.estimate(pair) or 0.0)
+        return total
+
+    def _steal_for(self, w):
+        victim = max((v for v in range(self.workers) if v != w and self.deques[v]),
+                     key=lambda v: self._work_left(self.deques[v]), default=None)
+        if victim is None:
+            return False
+        dq = self.deques[victim]
+        if len(dq) > 1:
+            self.deques[w].append(dq.pop())
+        else:
+            unit = self.units[dq[0]]
+            if unit[2] < 2:
+                return False
+            half = unit[2] // 2
+            unit[2] -= half
+            self.units.append([unit[0], unit[1], half])
+            self.deques[w].append(len(self.units) - 1)
+        self.steals += 1
+        return True
+
+    def _next_chunk(self, w):
+        dq = self.deques[w]
+        if not dq and not (self.steal and self._steal_for(w)):
+            return None
+        unit_id = dq[0]
+        pair, start_player, remaining = self.units[unit_id]
+        if not self.steal:
+            n = remaining
+        else:
+            est = self.costs.estimate(pair)
+            if est is None or est <= 0:
+                n = PROBE_GAMES
+            else:
+                n = int(self.target_chunk_s / est)
+                # Keep chunks below a share of what is left so the end stays even
+                left = self._work_left(i for d in self.deques for i in d)
+                n = min(n, int(left / (2 * self.workers * est)))
+            n = max(1, min(n, self.max_chunk, remaining))
+        self.units[unit_id][2] -= n
+        if self.units[unit_id][2] == 0:
+            dq.popleft()
+        self.chunks += 1
+        return unit_id, pair, start_player, n, self.chunk_kwargs
+
+    def run(self):
+        """Yield (pair, start_player, games) for each finished chunk."""
+        t0 = time.perf_counter()
+        results = mp.Queue()
+        tasks = [mp.Queue() for _ in range(self.workers)]
+        procs = [mp.Process(target=_worker, args=(w, tasks[w], results, self.run_chunk))
+                 for w in range(self.workers)]
+        for p in procs:
+            p.start()
+        failed = False
+        try:
+            outstanding = 0
+            for w in range(self.workers):
+                task = self._next_chunk(w)
+                if task:
+                    tasks[w].put(task)
+                    outstanding += 1
+            while outstanding:
+                try:
+                    msg = results.get(timeout=POLL_S)
+                except queue.Empty:
+                    for w, p in enumerate(procs):
+                        if not p.is_alive():
+                            failed = True
+                            raise RuntimeError(f'tournament worker {w} died (exit code {p.exitcode})')
+                    continue
+                if len(msg) == 4:
+                    w, unit_id, exc, tb = msg
+                    failed = True
+                    raise exc from RuntimeError(f'in tournament worker {w} playing '
+                                                f'{self.units[unit_id][0]}:\n{tb}')
+                w, unit_id, n, games, busy = msg
+                outstanding -= 1
+                self.busy[w] += busy
+                pair, start_player, _ = self.units[unit_id]
+                self.costs.update(pair, [g['duration'] for g in games])
+                task = self._next_chunk(w)
+                if task:
+                    tasks[w].put(task)
+                    outstanding += 1
+                yield pair, start_player, games
+        finally:
+            for q in tasks:
+                q.put(None)
+            for p in procs:
+                if failed:
+                    p.terminate()
+                p.join()
+            self.wall_s = time.perf_counter() - t0
+
+
+def static_makespan(pair_order, pair_seconds, workers):
+    """Estimated finish time of static sharding: the pairs list cut into
+    `workers` contiguous equal slices, each slice's measured time summed."""
+    per = math.ceil(len(pair_order) / workers) if pair_order else 0
+    shards = [pair_order[i:i + per] for i in range(0, len(pair_order), per or 1)]
+    return max((sum(pair_seconds.get(p, 0.0) for p in shard) for shard in shards), default=0.0)
@@ -0,0 +1,180 @@
+"""Persistent cache of solved Level 3 positions, shared across runs.
+
+Entries (position, side to move) -> (minimax value, chosen move) live in a
+SQLite file in WAL mode, so any number of processes can read while one
+writes; a busy timeout covers writers colliding. Every row carries the
+engine version (a hash of the engine and search sources): rows written by
+other versions are dropped when the file is opened.
+
+Nothing is read at import time. The first lookup opens the file and loads
+the current version's rows into memory; misses fall back to the file (a
+sibling process may have solved the position since) and new results are
+written back in small batches. When the file grows past `max_entries`
+the oldest rows are evicted.
+
+One cache may be used from several threads (the GUI searches in the
+background): they share a connection, serialized by a lock.
+
+Set TTT_SEARCH_CACHE=<path> (or pass --search-cache to main.py) to enable.
+Worker processes end through os._exit, which skips atexit, so they call
+flush_loaded() themselves before exiting.
+"""
+import atexit
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+ENV_VAR = 'TTT_SEARCH_CACHE'
+MAX_ENTRIES = 200000
+FLUSH_EVERY = 64
+FLUSH_INTERVAL_S = 1.0
+
+_SOURCES = ['tictactoe_engine.py', os.path.join('Level3', 'ai_level3.py')]
+
+
+def engine_version():
+    h = hashlib.sha1()
+    src = os.path.dirname(os.path.abspath(__file__))
+    for name in _SOURCES:
+        with open(os.path.join(src, name), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def position_key(board, player):
+    rows = '/'.join(''.join(cell or '.' for cell in row) for row in board)
+    return rows + ':' + player
+
+
+class SearchCache:
+    def __init__(self, path, max_entries=MAX_ENTRIES, version=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version or engine_version()
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+        self._memo = None
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+
+    def _connect(self):
+        # A connection must not cross a fork; each process opens its own
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        if self._pid is not None and self._pid != os.getpid():
+            self._pending = []
+        conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA busy_timeout=30000')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        with conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS positions ('
+                         'version TEXT, key TEXT, value INTEGER, row INTEGER, col INTEGER, '
+                         'stamp REAL, PRIMARY KEY (version, key))')
+            conn.execute('CREATE INDEX IF NOT EXISTS positions_stamp ON positions (stamp)')
+            conn.execute('DELETE FROM positions WHERE version != ?', (self.version,))
+        self._conn = conn
+        self._pid = os.getpid()
+        return conn
+
+    def _warm(self):
+        with self._lock:
+            if self._memo is None or self._pid != os.getpid():
+                conn = self._connect()
+                rows = conn.execute('SELECT key, value, row, col FROM positions WHERE version = ?',
+                                    (self.version,))
+                self._memo = {key: (value, (r, c)) for key, value, r, c in rows}
+            return self._memo
+
+    def get(self, board, player):
+        """Return (value, move) or None."""
+        key = position_key(board, player)
+        with self._lock:
+            memo = self._warm()
+            entry = memo.get(key)
+            if entry is None:
+                row = self._conn.execute('SELECT value, row, col FROM positions '
+                                         'WHERE version = ? AND key = ?', (self.version, key)).fetchone()
+                if row is not None:
+                    entry = memo[key] = (row[0], (row[1], row[2]))
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def put(self, board, player, value, move):
+        key = position_key(board, player)
+        with self._lock:
+            self._warm()[key] = (value, move)
+            self._pending.append((self.version, key, value, move[0], move[1], time.time()))
+            if (len(self._pending) >= FLUSH_EVERY
+                    or time.monotonic() - self._last_flush >= FLUSH_INTERVAL_S):
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            conn = self._connect()
+            pending, self._pending = self._pending, []
+            with conn:
+                conn.executemany('INSERT OR REPLACE INTO positions VALUES (?, ?, ?, ?, ?, ?)', pending)
+                extra = conn.execute('SELECT COUNT(*) FROM positions').fetchone()[0] - self.max_entries
+                if extra > 0:
+                    conn.execute('DELETE FROM positions WHERE rowid IN '
+                                 '(SELECT rowid FROM positions ORDER BY stamp LIMIT ?)', (extra,))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self.flush()
+                self._conn.close()
+            self._conn = None
+
+
+_default = None
+
+
+def default_cache():
+    """The cache named by TTT_SEARCH_CACHE, or None when it is unset."""
+    global _default
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return None
+    if _default is None or _default.path != path:
+        if _default is not None:
+            _default.close()
+        _default = SearchCache(path)
+    return _default
+
+
+def _close_default():
+    if _default is not None and _default._pid == os.getpid():
+        _default.flush()
+
+
+def flush_loaded():
+    """Flush the default cache of every loaded copy of this module (the
+    search code imports it as search_cache, main.py as src.search_cache)."""
+    for name in ('search_cache', 'src.search_cache'):
+        module = sys.modules.get(name)
+        if module is not None:
+            module._close_default()
+
+
+def _after_fork():
+    # A lock held by another thread at fork time would never be released
+    if _default is not None:
+        _default._lock = threading.RLock()
+
+
+atexit.register(_close_default)
+os.register_at_fork(after_in_child=_after_fork)
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 GRID_SIZE = 3
 
 X = "X"
@@ -5,23 +7,30 @@ O = "O"
 EMPTY = None
 
 
-def new_board():
-    return [[EMPTY for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+def new_board(size=GRID_SIZE):
+    return [[EMPTY for _ in range(size)] for _ in range(size)]
 
 
 def copy_board(board):
     return [row[:] for row in board]
 
 
+def board_key(board):
+    return tuple(tuple(row) for row in board)
+
+
 def get_next_player(player):
     return O if player == X else X
 
 
+# One geometry throughout: m,n,k. Every function takes the board's rows and
+# columns from the board itself, and k (marks in a row to win) defaults to
+# the shorter side, so an n x n board plays n-in-a-row.
 def available_moves(board):
     moves = []
-    for r in range(GRID_SIZE):
-        for c in range(GRID_SIZE):
-            if board[r][c] is EMPTY:
+    for r, row in enumerate(board):
+        for c, cell in enumerate(row):
+            if cell is EMPTY:
                 moves.append((r, c))
     return moves
 
@@ -32,7 +41,7 @@ def is_legal_move(board, move):
 
     r, c = move
 
-    if r < 0 or r >= GRID_SIZE or c < 0 or c >= GRID_SIZE:
+    if r < 0 or r >= len(board) or c < 0 or c >= len(board[0]):
         return False
 
     return board[r][c] is EMPTY
@@ -52,35 +61,116 @@ def apply_move(board, move, player):
     return new_b
 
 
-def check_winner(board):
-    for r in range(GRID_SIZE):
-        if board[r][0] is not EMPTY and all(
-            board[r][c] == board[r][0] for c in range(GRID_SIZE)
-        ):
-            return board[r][0]
+def check_winner(board, k=None):
+    """The mark with k in a row (see winning_lines), or None."""
+    for line in _board_lines(len(board), len(board[0]), k or min(len(board), len(board[0]))):
+        r, c = line[0]
+        first = board[r][c]
+        if first is not EMPTY and all(board[i][j] == first for i, j in line[1:]):
+            return first
+    return None
 
-    for c in range(GRID_SIZE):
-        if board[0][c] is not EMPTY and all(
-            board[r][c] == board[0][c] for r in range(GRID_SIZE)
-        ):
-            return board[0][c]
 
-    if board[0][0] is not EMPTY and all(
-        board[i][i] == board[0][0] for i in range(GRID_SIZE)
-    ):
-        return board[0][0]
+def is_tie(board, k=None):
+    return check_winner(board, k) is None and len(available_moves(board)) == 0
 
-    if board[0][GRID_SIZE - 1] is not EMPTY and all(
-        board[i][GRID_SIZE - 1 - i] == board[0][GRID_SIZE - 1] for i in range(GRID_SIZE)
-    ):
-        return board[0][GRID_SIZE - 1]
 
-    return None
+def is_terminal(board, k=None):
+    return check_winner(board, k) is not None or is_tie(board, k)
+
+
+@lru_cache(maxsize=None)
+def winning_lines(rows, cols, k):
+    """All k-in-a-row lines of a rows x cols board, as tuples of flat cell
+    indices (r * cols + c)."""
+    lines = []
+    for r in range(rows):
+        for c in range(cols):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                if 0 <= end_r < rows and 0 <= end_c < cols:
+                    lines.append(tuple((r + dr * i) * cols + c + dc * i for i in range(k)))
+    return tuple(lines)
+
+
+@lru_cache(maxsize=None)
+def _board_lines(rows, cols, k):
+    # winning_lines() as (row, col) pairs, for list boards
+    return tuple(tuple(divmod(i, cols) for i in line) for line in winning_lines(rows, cols, k))
+
+
+@lru_cache(maxsize=None)
+def lines_through(rows, cols, k):
+    """For each flat cell index, the winning lines that contain it."""
+    through = [[] for _ in range(rows * cols)]
+    for line in winning_lines(rows, cols, k):
+        for cell in line:
+            through[cell].append(line)
+    return tuple(tuple(ls) for ls in through)
+
+
+# Batch API: many boards at once as a numpy array of shape (..., rows * cols),
+# cells 0 empty, 1 X, 2 O. numpy is only imported when these are called.
+# rows/cols default to a square board and k to its shorter side, as check_winner.
+CODES = {EMPTY: 0, X: 1, O: 2}
+MARKS = (EMPTY, X, O)
+
+
+@lru_cache(maxsize=None)
+def line_matrix(rows, cols, k):
+    """winning_lines() as a read-only (lines, k) index array."""
+    import numpy as np
+    m = np.array(winning_lines(rows, cols, k), dtype=np.intp).reshape(-1, k)
+    m.flags.writeable = False
+    return m
+
+
+def _geometry(cells, rows, cols, k):
+    if rows is None:
+        rows = int(round(cells ** 0.5))
+    if cols is None:
+        cols = cells // rows
+    if rows * cols != cells:
+        raise ValueError(f'{cells} cells do not make a {rows} x {cols} board')
+    return rows, cols, k or min(rows, cols)
+
+
+def to_array(boards):
+    """List boards (all the same shape) -> (N, cells) int8 array."""
+    import numpy as np
+    codes = CODES
+    return np.array([[codes[v] for row in b for v in row] for b in boards], dtype=np.int8)
+
+
+def from_array(boards, rows=None, cols=None):
+    """(N, cells) array -> list boards."""
+    rows, cols, _ = _geometry(boards.shape[-1], rows, cols, None)
+    marks = MARKS
+    return [[[marks[v] for v in flat[r * cols:(r + 1) * cols]] for r in range(rows)]
+            for flat in boards.tolist()]
+
+
+def batch_winners(boards, rows=None, cols=None, k=None):
+    """Winner per board (0 none, 1 X, 2 O), from the first complete line in
+    winning_lines() order."""
+    import numpy as np
+    rows, cols, k = _geometry(boards.shape[-1], rows, cols, k)
+    cells = boards[..., line_matrix(rows, cols, k)]
+    first = cells[..., 0]
+    full = (first != 0) & (cells == first[..., None]).all(axis=-1)
+    won = np.take_along_axis(first, full.argmax(axis=-1)[..., None], axis=-1)[..., 0]
+    return np.where(full.any(axis=-1), won, 0).astype(np.int8)
 
 
-def is_tie(board):
-    return check_winner(board) is None and len(available_moves(board)) == 0
+def batch_terminal(boards, rows=None, cols=None, k=None):
+    """True where a board has a winner or no empty cell left."""
+    return (batch_winners(boards, rows, cols, k) != 0) | (boards != 0).all(axis=-1)
 
 
-def is_terminal(board):
-    return check_winner(board) is not None or is_tie(board)
+def batch_legal(boards):
+    """Bitmask of the empty cells of each board (bit i = flat cell i)."""
+    import numpy as np
+    cells = boards.shape[-1]
+    if cells > 63:
+        raise ValueError('legal-move bitmasks hold at most 63 cells')
+    return (boards == 0).astype(np.int64) @ np.left_shift(1, np.arange(cells, dtype=np.int64))
@@ -2,6 +2,7 @@ import pygame
 import sys
 from tictactoe_engine import (
     new_board,
+    copy_board,
     make_move_in_place,
     check_winner,
     is_tie,
@@ -10,10 +11,10 @@ from tictactoe_engine import (
     O,
 )
 
-# Import AI modules
-import Level1.ai_player as ai1  # Level 1
-import Level3.ai_level3 as ai3  # Level 3 
-import Level2.start as ai2
+# AI players (levels 1-4), see players.py
+from players import make_player
+from ponder import Ponderer
+from hints import HintCache
 
 
 WIDTH, HEIGHT = 600, 700
@@ -27,6 +28,7 @@ X_COLOR = (220, 60, 60)
 O_COLOR = (60, 90, 220)
 WIN_LINE_COLOR = (20, 160, 20)
 TEXT_COLOR = (20, 20, 20)
+HINT_COLORS = {1: (20, 140, 20), 0: (110, 110, 110), -1: (200, 40, 40)}
 
 FPS = 60
 
@@ -114,17 +116,47 @@ def draw_win_line(screen, board):
         pygame.draw.line(screen, WIN_LINE_COLOR, (x1, y1), (x2, y2), 14)
 
 
+def hint_label(value, plies):
+    if value > 0:
+        return f"Win {plies}"
+    if value < 0:
+        return f"Loss {plies}"
+    return "Draw"
+
+
+def draw_hints(screen, font, analysis, surfaces):
+    # Text and tint surfaces are rendered once and reused every frame
+    for (r, c), (value, plies) in analysis.items():
+        tint = surfaces.get(value)
+        if tint is None:
+            tint = surfaces[value] = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+            tint.fill(HINT_COLORS[value] + (40,))
+        label = hint_label(value, plies)
+        text = surfaces.get(label)
+        if text is None:
+            text = surfaces[label] = font.render(label, True, HINT_COLORS[value])
+        x0 = c * CELL_SIZE
+        y0 = r * CELL_SIZE
+        screen.blit(tint, (x0, y0))
+        screen.blit(text, text.get_rect(center=(x0 + CELL_SIZE // 2, y0 + CELL_SIZE // 2)))
+
+
 def draw_status(
-    screen, font, current_player, winner, tie, player_X_type, player_O_type, ai_level
+    screen, font, current_player, winner, tie, player_X_type, player_O_type, ai_level,
+    pondering=False, hints=False,
 ):
     status_rect = pygame.Rect(0, WIDTH, WIDTH, HEIGHT - WIDTH)
     pygame.draw.rect(screen, BG_COLOR, status_rect)
     if winner:
-        msg = f"{winner} wins! (R reset | X/O toggle | 1/2/3 AI)"
+        msg = f"{winner} wins! (R reset | X/O toggle | 1-4 AI)"
     elif tie:
-        msg = f"Tie game! (R reset | X/O toggle | 1/2/3 AI)"
+        msg = f"Tie game! (R reset | X/O toggle | 1-4 AI)"
     else:
         msg = f"Turn: {current_player} | X: {player_X_type} | O: {player_O_type} | AI Level: {ai_level}"
+        if pondering:
+            msg += " | P"
+        if hints:
+            msg += " | H"
     text = font.render(msg, True, TEXT_COLOR)
     screen.blit(text, (20, WIDTH + 40))
 
@@ -135,6 +167,7 @@ def main():
     pygame.display.set_caption("Tic Tac Toe")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 30)
+    hint_font = pygame.font.SysFont(None, 40)
 
     board = new_board()
     current_player = X
@@ -144,10 +177,42 @@ def main():
     # Player types
     player_X_type = "AI"  # or "Human"
     player_O_type = "AI"  # or "Human"
-    ai_player_X = ai2
-    ai_player_O = ai3
+    ai_player_X = make_player(2)
+    ai_player_O = make_player(3)
     ai_level = 1
 
+    def new_game():
+        ai_player_X.new_game(X)
+        ai_player_O.new_game(O)
+
+    def observe(player, move):
+        # Tell the other side's AI about a move just played
+        (ai_player_O if player == X else ai_player_X).observe(move)
+
+    new_game()
+
+    # Search AI replies during the human's turn (toggle with P)
+    ponder = Ponderer()
+    ponder_enabled = True
+
+    # Per-cell evaluations (toggle with H), computed off the frame loop
+    hints = HintCache()
+    hints_enabled = False
+    hint_surfaces = {}
+
+    # Undo (Z) / redo (Y) stacks of (board, current_player, winner, tie)
+    history = []
+    redo = []
+
+    def snapshot():
+        return (copy_board(board), current_player, winner, tie)
+
+    def has_human():
+        return "Human" in (player_X_type, player_O_type)
+
+    def side_type(player):
+        return player_X_type if player == X else player_O_type
+
     running = True
     while running:
         clock.tick(FPS)
@@ -156,45 +221,70 @@ def main():
             if event.type == pygame.QUIT:
                 running = False
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
+                ponder.stop()
+                if event.key == pygame.K_p:
+                    ponder_enabled = not ponder_enabled
+                elif event.key == pygame.K_h:
+                    hints_enabled = not hints_enabled
+                elif event.key in (pygame.K_z, pygame.K_y):
+                    # Step back/forward a ply, and on to a human's turn if there is one
+                    source, target = (history, redo) if event.key == pygame.K_z else (redo, history)
+                    while source:
+                        target.append(snapshot())
+                        board, current_player, winner, tie = source.pop()
+                        if not has_human() or side_type(current_player) == "Human":
+                            break
+                    new_game()
+                elif event.key == pygame.K_r:
                     board = new_board()
                     current_player = X
                     winner = None
                     tie = False
+                    history.clear()
+                    redo.clear()
+                    new_game()
                 elif event.key == pygame.K_x:
                     player_X_type = "Human" if player_X_type == "AI" else "AI"
                     board = new_board()
                     current_player = X
                     winner = None
                     tie = False
+                    history.clear()
+                    redo.clear()
+                    new_game()
                 elif event.key == pygame.K_o:
                     player_O_type = "Human" if player_O_type == "AI" else "AI"
                     board = new_board()
                     current_player = X
                     winner = None
                     tie = False
-                elif event.key == pygame.K_1:
-                    ai_level = 1
-                    ai_player_X = ai1
-                    ai_player_O = ai1
-                elif event.key == pygame.K_3:
-                    ai_level = 3
-                    ai_player_X = ai3
-                    ai_player_O = ai3
-                elif event.key == pygame.K_2:
-                    ai_level = 2
-                    ai_player_X = ai2
-                    ai_player_O = ai2
-                # Add keys for ai2/ai3 if needed
+                    history.clear()
+                    redo.clear()
+                    new_game()
+                elif event.key in (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4):
+                    ai_level = event.key - pygame.K_0
+                    for ai in (ai_player_X, ai_player_O):
+                        ai.close()
+                    ai_player_X = make_player(ai_level)
+                    ai_player_O = make_player(ai_level)
+                    new_game()
 
         # Determine current player type
         current_type = player_X_type if current_player == X else player_O_type
 
         # Human move
         if current_type == "Human" and not winner and not tie:
+            other_type = player_O_type if current_player == X else player_X_type
+            if ponder_enabled and other_type == "AI":
+                other_ai = ai_player_O if current_player == X else ai_player_X
+                ponder.start(board, current_player, other_ai.get_move)
             if pygame.mouse.get_pressed()[0]:
                 move = get_move_from_player(pygame.mouse.get_pos())
+                before = snapshot()
                 if move and make_move_in_place(board, move, current_player):
+                    history.append(before)
+                    redo.clear()
+                    observe(current_player, move)
                     winner = check_winner(board)
                     tie = is_tie(board)
                     if not winner and not tie:
@@ -203,8 +293,14 @@ def main():
         # AI move
         if current_type == "AI" and not winner and not tie:
             ai_module = ai_player_X if current_player == X else ai_player_O
-            move = ai_module.get_move(board, current_player)
+            move = ponder.take(board) if ponder_enabled else None
+            if move is None:
+                move = ai_module.get_move(board, current_player)
+            before = snapshot()
             if move and make_move_in_place(board, move, current_player):
+                history.append(before)
+                redo.clear()
+                observe(current_player, move)
                 winner = check_winner(board)
                 tie = is_tie(board)
                 if not winner and not tie:
@@ -215,6 +311,10 @@ def main():
         draw_marks(screen, board)
         if winner:
             draw_win_line(screen, board)
+        elif hints_enabled and not tie:
+            analysis = hints.get(board, current_player)
+            if analysis:
+                draw_hints(screen, hint_font, analysis, hint_surfaces)
         draw_status(
             screen,
             font,
@@ -224,9 +324,14 @@ def main():
             player_X_type,
             player_O_type,
             ai_level,
+            pondering=ponder_enabled,
+            hints=hints_enabled,
         )
         pygame.display.flip()
 
+    ponder.stop()
+    ai_player_X.close()
+    ai_player_O.close()
     pygame.quit()
     sys.exit()
 
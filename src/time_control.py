@@ -0,0 +1,149 @@
+"""Per-move time controls enforced by the game loop.
+
+A timed AI runs in its own child process (MoveWorker). If it has not
+answered when its clock runs out, the process is killed, restarted for the
+next game, and the move counts as a forfeit.
+
+Time control specs, per AI level:
+  "0.5"     at most 0.5 s for every move
+  "10+0.1"  10 s for the whole game plus 0.1 s added after each move
+"""
+import multiprocessing as mp
+import time
+from src.search_cache import flush_loaded
+
+
+class MoveTimeout(Exception):
+    pass
+
+
+class TimeControl:
+    def __init__(self, per_move=None, base=None, increment=0.0):
+        self.per_move = per_move
+        self.base = base
+        self.increment = increment
+
+    @classmethod
+    def parse(cls, spec):
+        if '+' in spec:
+            base, inc = spec.split('+')
+            return cls(base=float(base), increment=float(inc))
+        return cls(per_move=float(spec))
+
+    def new_clock(self):
+        return Clock(self)
+
+
+class Clock:
+    def __init__(self, control):
+        self.control = control
+        self.remaining = control.base
+        self.used = 0.0
+        self.timed_out = False
+
+    def limit(self):
+        if self.control.per_move is not None:
+            return self.control.per_move
+        return max(0.0, self.remaining)
+
+    def charge(self, elapsed):
+        self.used += elapsed
+        if self.remaining is not None:
+            self.remaining += self.control.increment - elapsed
+
+
+def parse_time_controls(s):
+    # s like "3=0.5;2=10+0.1" -> {3: TimeControl, 2: TimeControl}
+    controls = {}
+    for part in s.split(';'):
+        if not part.strip():
+            continue
+        level, spec = part.split('=')
+        controls[int(level)] = TimeControl.parse(spec.strip())
+    return controls
+
+
+def _serve(conn, player):
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        if msg[0] == 'move':
+            conn.send(player.get_move(*msg[1:]))
+        else:
+            getattr(player, msg[0])(*msg[1:])
+    player.close()
+    flush_loaded()
+
+
+class MoveWorker:
+    """Runs `player` in a child process so a slow move can be cut off.
+
+    Behaves like the player itself (see players.py), playing on `clock`,
+    which new_game() resets. After a timeout the process is killed and the
+    next game starts from a fresh copy of `player`.
+    """
+
+    def __init__(self, player, control):
+        self._player = player
+        self._proc = None
+        self._conn = None
+        self.control = control
+        self.clock = control.new_clock()
+
+    def new_game(self, side):
+        # (Re)start the process now so spawn time never counts against the clock
+        self.clock = self.control.new_clock()
+        if self._proc is None:
+            self._start()
+        self._conn.send(('new_game', side))
+
+    def observe(self, move):
+        if self._proc is not None:
+            self._conn.send(('observe', move))
+
+    def _start(self):
+        parent, child = mp.Pipe()
+        self._proc = mp.Process(target=_serve, args=(child, self._player), daemon=True)
+        self._proc.start()
+        child.close()
+        self._conn = parent
+
+    def get_move(self, board, player):
+        """Ask for a move within the clock's limit; raises MoveTimeout."""
+        clock = self.clock
+        if self._proc is None:
+            self._start()
+        limit = clock.limit()
+        t0 = time.perf_counter()
+        self._conn.send(('move', board, player))
+        if self._conn.poll(limit):
+            move = self._conn.recv()
+            elapsed = time.perf_counter() - t0
+            clock.charge(elapsed)
+            if elapsed <= limit:
+                return move
+        else:
+            clock.charge(time.perf_counter() - t0)
+            self._kill()
+        clock.timed_out = True
+        raise MoveTimeout(f'{player} exceeded {limit:.3f}s')
+
+    def _kill(self):
+        self._proc.kill()
+        self._proc.join()
+        self._conn.close()
+        self._proc = None
+        self._conn = None
+
+    def close(self):
+        if self._proc is None:
+            return
+        self._conn.send(None)
+        self._proc.join(timeout=1)
+        if self._proc.is_alive():
+            self._proc.kill()
+            self._proc.join()
+        self._conn.close()
+        self._proc = None
+        self._conn = None
@@ -0,0 +1,69 @@
+"""Compact game trajectories stored next to tournament results.
+
+Each game is one unsigned 32-bit integer: the cells played (r * size + c)
+written as a bijective base-(size*size) number, so the number of moves is
+implicit and any 3x3 game fits in 4 bytes. A sidecar file is the raw
+little-endian array of codes, one per CSV row and in the same order.
+"""
+import sys
+import os
+from array import array
+from collections import Counter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from tictactoe_engine import GRID_SIZE, new_board, make_move_in_place, get_next_player
+
+
+def encode(moves, size=GRID_SIZE):
+    base = size * size
+    code = 0
+    for r, c in moves:
+        code = code * base + r * size + c + 1
+    return code
+
+
+def decode(code, size=GRID_SIZE):
+    base = size * size
+    cells = []
+    while code:
+        code -= 1
+        cells.append(code % base)
+        code //= base
+    cells.reverse()
+    return [divmod(cell, size) for cell in cells]
+
+
+def write_codes(f, codes):
+    # `f` is a file opened in binary mode; codes go out as uint32 LE
+    arr = array('I', codes)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    arr.tofile(f)
+
+
+def load_codes(path):
+    arr = array('I')
+    with open(path, 'rb') as f:
+        arr.frombytes(f.read())
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+def iter_trajectories(path, size=GRID_SIZE):
+    for code in load_codes(path):
+        yield decode(code, size)
+
+
+def replay(moves, starting_player):
+    """Yield (move, player, board) after each move; the board is reused."""
+    board = new_board()
+    player = starting_player
+    for move in moves:
+        make_move_in_place(board, move, player)
+        yield move, player, board
+        player = get_next_player(player)
+
+
+def trajectory_counts(path):
+    # Counting on the raw codes avoids decoding every game
+    return Counter(load_codes(path))
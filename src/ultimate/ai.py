@@ -0,0 +1,106 @@
+"""Ultimate tic-tac-toe players: random (level 1) and MCTS (level 2).
+
+The MCTS player runs UCT with random playouts for a fixed number of
+iterations, or else until its per-move budget in seconds runs out (always
+at least one iteration), then plays the most visited move. The tree can
+outlive a move: search() grows a given root and advance() detaches the
+subtree after a move, which the registry's MCTS player uses to keep its
+tree for the whole game.
+"""
+import math
+import random
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ultimate.engine import legal_moves, play_in_place, get_next_player
+
+BUDGET_S = 0.1
+EXPLORATION = 1.4
+
+
+def random_get_move(state, player, rng=random):
+    moves = legal_moves(state)
+    return rng.choice(moves) if moves else None
+
+
+class _Node:
+    __slots__ = ('move', 'parent', 'children', 'untried', 'visits', 'wins', 'mover')
+
+    def __init__(self, state, move, parent, mover):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = legal_moves(state)
+        self.visits = 0
+        self.wins = 0.0
+        self.mover = mover      # side that played `move`; wins count for it
+
+
+def new_root(state):
+    return _Node(state, None, None, get_next_player(state.player))
+
+
+def advance(root, move):
+    """Return the subtree of `root` reached by `move`, or None if unexplored."""
+    for child in root.children:
+        if child.move == move:
+            child.parent = None
+            return child
+    return None
+
+
+def search(state, root, budget_s=BUDGET_S, iterations=None, rng=random):
+    """Grow `root` (the tree for `state`) and return the most visited move.
+
+    Runs `iterations` iterations if given, else until `budget_s` is spent.
+    """
+    moves = legal_moves(state)
+    if len(moves) == 1:
+        return moves[0]
+
+    deadline = time.perf_counter() + budget_s
+    done = 0
+    while not done or (done < iterations if iterations is not None
+                       else time.perf_counter() < deadline):
+        node = root
+        s = state.copy()
+
+        # Selection
+        while not node.untried and node.children:
+            log_n = math.log(node.visits)
+            node = max(node.children, key=lambda c: c.wins / c.visits
+                       + EXPLORATION * math.sqrt(log_n / c.visits))
+            play_in_place(s, node.move)
+
+        # Expansion
+        if node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            mover = s.player
+            play_in_place(s, move)
+            child = _Node(s, move, node, mover)
+            node.children.append(child)
+            node = child
+
+        # Playout
+        while s.winner is None:
+            play_in_place(s, rng.choice(legal_moves(s)))
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if s.winner == node.mover:
+                node.wins += 1.0
+            elif s.winner == 'Tie':
+                node.wins += 0.5
+            node = node.parent
+        done += 1
+
+    best = max(root.children, key=lambda c: c.visits)
+    return best.move
+
+
+def mcts_get_move(state, player, budget_s=BUDGET_S, iterations=None, rng=random):
+    if not legal_moves(state):
+        return None
+    return search(state, new_root(state), budget_s, iterations, rng)
@@ -0,0 +1,132 @@
+"""Ultimate tic-tac-toe: nine 3x3 boards arranged in a 3x3 meta-board.
+
+Each sub-board is a pair of 9-bit masks (one per player), so local wins are
+a table lookup. The cell you play in a sub-board sends your opponent to the
+matching sub-board; if that one is already won or full they may play in any
+open sub-board. Winning three sub-boards in a row wins the game.
+
+Moves are (board, cell) pairs, both 0-8 in row-major order. to_grid and
+from_grid convert to and from (row, col) on the 9x9 grid.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tictactoe_engine import X, O, get_next_player
+
+FULL = 0x1FF
+WIN_MASKS = (0b000000111, 0b000111000, 0b111000000,
+             0b001001001, 0b010010010, 0b100100100,
+             0b100010001, 0b001010100)
+# WON[mask] is True if the 9-bit mask contains a line
+WON = tuple(any(m & w == w for w in WIN_MASKS) for m in range(512))
+# Cells of each 9-bit mask, for move generation
+BITS = tuple(tuple(i for i in range(9) if m >> i & 1) for m in range(512))
+
+
+class State:
+    __slots__ = ('x', 'o', 'macro_x', 'macro_o', 'closed', 'forced', 'player', 'winner')
+
+    def __init__(self, player=X):
+        self.x = [0] * 9
+        self.o = [0] * 9
+        self.macro_x = 0        # sub-boards won by X
+        self.macro_o = 0        # sub-boards won by O
+        self.closed = 0         # sub-boards won or full
+        self.forced = -1        # sub-board the next move must be in, -1 for any
+        self.player = player    # side to move
+        self.winner = None      # X, O or 'Tie' once the game is over
+
+    def copy(self):
+        s = State.__new__(State)
+        s.x = self.x[:]
+        s.o = self.o[:]
+        s.macro_x = self.macro_x
+        s.macro_o = self.macro_o
+        s.closed = self.closed
+        s.forced = self.forced
+        s.player = self.player
+        s.winner = self.winner
+        return s
+
+    def key(self):
+        return (tuple(self.x), tuple(self.o), self.forced, self.player)
+
+
+def new_state(player=X):
+    return State(player)
+
+
+def legal_moves(state):
+    if state.winner is not None:
+        return []
+    if state.forced >= 0:
+        boards = (state.forced,)
+    else:
+        boards = BITS[FULL & ~state.closed]
+    moves = []
+    for b in boards:
+        for cell in BITS[FULL & ~(state.x[b] | state.o[b])]:
+            moves.append((b, cell))
+    return moves
+
+
+def is_legal_move(state, move):
+    return move in legal_moves(state)
+
+
+def play_in_place(state, move):
+    """Play `move` for the side to move; the move must be legal."""
+    b, cell = move
+    bit = 1 << cell
+    if state.player == X:
+        mask = state.x[b] = state.x[b] | bit
+        if WON[mask]:
+            state.macro_x |= 1 << b
+            state.closed |= 1 << b
+            if WON[state.macro_x]:
+                state.winner = X
+    else:
+        mask = state.o[b] = state.o[b] | bit
+        if WON[mask]:
+            state.macro_o |= 1 << b
+            state.closed |= 1 << b
+            if WON[state.macro_o]:
+                state.winner = O
+    if (state.x[b] | state.o[b]) == FULL:
+        state.closed |= 1 << b
+    if state.winner is None and state.closed == FULL:
+        state.winner = 'Tie'
+    state.forced = -1 if state.closed >> cell & 1 else cell
+    state.player = get_next_player(state.player)
+
+
+def apply_move(state, move):
+    s = state.copy()
+    play_in_place(s, move)
+    return s
+
+
+def cell_owner(state, b, cell):
+    bit = 1 << cell
+    if state.x[b] & bit:
+        return X
+    if state.o[b] & bit:
+        return O
+    return None
+
+
+def board_owner(state, b):
+    if state.macro_x >> b & 1:
+        return X
+    if state.macro_o >> b & 1:
+        return O
+    return None
+
+
+def to_grid(move):
+    b, cell = move
+    return (b // 3) * 3 + cell // 3, (b % 3) * 3 + cell % 3
+
+
+def from_grid(row, col):
+    return (row // 3) * 3 + col // 3, (row % 3) * 3 + col % 3
@@ -0,0 +1,166 @@
+import pygame
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ultimate.engine import (
+    new_state,
+    legal_moves,
+    play_in_place,
+    cell_owner,
+    board_owner,
+    from_grid,
+    X,
+    O,
+)
+from players import make_player, levels
+
+
+WIDTH, HEIGHT = 630, 720
+CELL_SIZE = WIDTH // 9
+BOARD_SIZE = CELL_SIZE * 3
+
+BG_COLOR = (245, 245, 245)
+LINE_COLOR = (40, 40, 40)
+THIN_LINE_COLOR = (150, 150, 150)
+X_COLOR = (220, 60, 60)
+O_COLOR = (60, 90, 220)
+ACTIVE_COLOR = (225, 245, 215)
+TEXT_COLOR = (20, 20, 20)
+
+FPS = 60
+
+AI_LEVELS = levels('ultimate')
+
+
+def get_move_from_player(mouse_pos):
+    x, y = mouse_pos
+    if x < 0 or x >= WIDTH or y < 0 or y >= WIDTH:
+        return None
+    return from_grid(y // CELL_SIZE, x // CELL_SIZE)
+
+
+def draw_grid(screen, state):
+    # Shade the sub-boards the side to move may play in
+    for b in {m[0] for m in legal_moves(state)}:
+        x0 = (b % 3) * BOARD_SIZE
+        y0 = (b // 3) * BOARD_SIZE
+        pygame.draw.rect(screen, ACTIVE_COLOR, (x0, y0, BOARD_SIZE, BOARD_SIZE))
+    for i in range(1, 9):
+        color, width = (LINE_COLOR, 6) if i % 3 == 0 else (THIN_LINE_COLOR, 2)
+        pygame.draw.line(screen, color, (i * CELL_SIZE, 0), (i * CELL_SIZE, WIDTH), width)
+        pygame.draw.line(screen, color, (0, i * CELL_SIZE), (WIDTH, i * CELL_SIZE), width)
+
+
+def draw_mark(screen, mark, x0, y0, size, padding, width):
+    if mark == X:
+        pygame.draw.line(screen, X_COLOR, (x0 + padding, y0 + padding),
+                         (x0 + size - padding, y0 + size - padding), width)
+        pygame.draw.line(screen, X_COLOR, (x0 + size - padding, y0 + padding),
+                         (x0 + padding, y0 + size - padding), width)
+    elif mark == O:
+        center = (x0 + size // 2, y0 + size // 2)
+        pygame.draw.circle(screen, O_COLOR, center, size // 2 - padding, width)
+
+
+def draw_marks(screen, state):
+    for b in range(9):
+        for cell in range(9):
+            mark = cell_owner(state, b, cell)
+            if mark:
+                x0 = ((b % 3) * 3 + cell % 3) * CELL_SIZE
+                y0 = ((b // 3) * 3 + cell // 3) * CELL_SIZE
+                draw_mark(screen, mark, x0, y0, CELL_SIZE, 14, 4)
+        owner = board_owner(state, b)
+        if owner:
+            draw_mark(screen, owner, (b % 3) * BOARD_SIZE, (b // 3) * BOARD_SIZE, BOARD_SIZE, 16, 12)
+
+
+def draw_status(screen, font, state, player_X_type, player_O_type, ai_level):
+    status_rect = pygame.Rect(0, WIDTH, WIDTH, HEIGHT - WIDTH)
+    pygame.draw.rect(screen, BG_COLOR, status_rect)
+    if state.winner == 'Tie':
+        msg = "Tie game! (R reset | X/O toggle | 1/2 AI)"
+    elif state.winner:
+        msg = f"{state.winner} wins! (R reset | X/O toggle | 1/2 AI)"
+    else:
+        msg = f"Turn: {state.player} | X: {player_X_type} | O: {player_O_type} | AI Level: {ai_level}"
+    text = font.render(msg, True, TEXT_COLOR)
+    screen.blit(text, (20, WIDTH + 40))
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Ultimate Tic Tac Toe")
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont(None, 28)
+
+    state = new_state()
+    player_X_type = "Human"
+    player_O_type = "AI"
+    ai_level = 2
+    players = {}
+
+    def new_game():
+        # A fresh player per side, so each keeps its own MCTS tree
+        for p in players.values():
+            p.close()
+        players[X] = make_player(ai_level, 'ultimate')
+        players[O] = make_player(ai_level, 'ultimate')
+        players[X].new_game(X)
+        players[O].new_game(O)
+
+    def play(move):
+        player = state.player
+        play_in_place(state, move)
+        players[O if player == X else X].observe(move)
+
+    new_game()
+
+    running = True
+    while running:
+        clock.tick(FPS)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r:
+                    state = new_state()
+                    new_game()
+                elif event.key == pygame.K_x:
+                    player_X_type = "Human" if player_X_type == "AI" else "AI"
+                    state = new_state()
+                    new_game()
+                elif event.key == pygame.K_o:
+                    player_O_type = "Human" if player_O_type == "AI" else "AI"
+                    state = new_state()
+                    new_game()
+                elif event.key - pygame.K_0 in AI_LEVELS:
+                    ai_level = event.key - pygame.K_0
+                    new_game()
+            if (event.type == pygame.MOUSEBUTTONDOWN and event.button == 1
+                    and state.winner is None):
+                current_type = player_X_type if state.player == X else player_O_type
+                move = get_move_from_player(event.pos)
+                if current_type == "Human" and move in legal_moves(state):
+                    play(move)
+
+        current_type = player_X_type if state.player == X else player_O_type
+        if current_type == "AI" and state.winner is None:
+            move = players[state.player].get_move(state.copy(), state.player)
+            if move in legal_moves(state):
+                play(move)
+
+        screen.fill(BG_COLOR)
+        draw_grid(screen, state)
+        draw_marks(screen, state)
+        draw_status(screen, font, state, player_X_type, player_O_type, ai_level)
+        pygame.display.flip()
+
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()